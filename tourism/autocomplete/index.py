@@ -0,0 +1,148 @@
+"""In-process prefix index of place and hotel names
+
+Every worker keeps the names in a sorted array of casefolded keys, one
+key per word start, so ``q`` matches the names having a word starting
+with it and is answered by a binary search. The index is built on first
+use, kept current by the model signals of this process and rebuilt
+after ``AUTOCOMPLETE_INDEX_TTL`` seconds to pick up the changes saved by
+other workers.
+"""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+
+from core.models import HotelAndResidence
+from place.models import Places
+
+# kind of entry -> model whose names are indexed
+SOURCES = {
+    'place': Places,
+    'hotel': HotelAndResidence,
+}
+
+
+def normalize(text):
+    """Return the form names and queries are compared in"""
+    return ' '.join(text.casefold().split())
+
+
+def word_keys(name):
+    """Return the keys of name, one per word start"""
+    name = normalize(name)
+    return [name[i:] for i in range(len(name))
+            if i == 0 or name[i - 1] == ' ']
+
+
+class PrefixIndex:
+    """Sorted (key, kind, id, name) entries searched by prefix"""
+
+    def __init__(self):
+        self._keys = []
+        self._entries = []
+        self._names = {}
+        self._lock = threading.Lock()
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._names)
+
+    def build(self, rows):
+        """Replace the entries by the (kind, id, name) rows"""
+        entries = sorted(
+            (key, kind, pk, name)
+            for kind, pk, name in rows for key in word_keys(name))
+        names = {(kind, pk): name for kind, pk, name in rows}
+        with self._lock:
+            self._entries = entries
+            self._keys = [entry[0] for entry in entries]
+            self._names = names
+            self.built_at = time.monotonic()
+
+    def add(self, kind, pk, name):
+        """Index the name of (kind, pk), replacing its previous name"""
+        with self._lock:
+            self._remove(kind, pk)
+            for key in word_keys(name):
+                i = bisect.bisect_left(self._entries, (key, kind, pk, name))
+                self._entries.insert(i, (key, kind, pk, name))
+                self._keys.insert(i, key)
+            self._names[kind, pk] = name
+
+    def remove(self, kind, pk):
+        """Drop (kind, pk) from the index"""
+        with self._lock:
+            self._remove(kind, pk)
+
+    def _remove(self, kind, pk):
+        name = self._names.pop((kind, pk), None)
+        if name is None:
+            return
+        for key in word_keys(name):
+            i = bisect.bisect_left(self._entries, (key, kind, pk, name))
+            del self._entries[i]
+            del self._keys[i]
+
+    def search(self, q, limit):
+        """Return up to limit (kind, id, name) whose words start with q
+
+        Names repeated within a kind, like the bookings of one hotel,
+        are returned once.
+        """
+        q = normalize(q)
+        results, seen = [], set()
+        with self._lock:
+            i = bisect.bisect_left(self._keys, q)
+            while i < len(self._keys) and len(results) < limit:
+                key, kind, pk, name = self._entries[i]
+                if not key.startswith(q):
+                    break
+                if (kind, name) not in seen:
+                    seen.add((kind, name))
+                    results.append((kind, pk, name))
+                i += 1
+
+        return results
+
+
+index = PrefixIndex()
+build_lock = threading.Lock()
+
+
+def load_rows():
+    """Read the (kind, id, name) rows of every source"""
+    return [(kind, pk, name)
+            for kind, model in SOURCES.items()
+            for pk, name in model.objects.values_list('pk', 'name')
+            .iterator()]
+
+
+def _expired():
+    built_at = index.built_at
+    return built_at is None or \
+        time.monotonic() - built_at > settings.AUTOCOMPLETE_INDEX_TTL
+
+
+def get_index():
+    """Return the index, (re)building it when missing or expired
+
+    One thread of the worker builds at a time. Requests wait for the
+    first build only, while an expired index is rebuilt the others keep
+    searching it.
+    """
+    if not _expired():
+        return index
+
+    if index.built_at is None:
+        with build_lock:
+            if index.built_at is None:
+                index.build(load_rows())
+    elif build_lock.acquire(blocking=False):
+        try:
+            if _expired():
+                index.build(load_rows())
+        finally:
+            build_lock.release()
+
+    return index
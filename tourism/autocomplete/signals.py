@@ -0,0 +1,27 @@
+"""Signal handlers keeping the autocomplete index of this worker current"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from autocomplete.index import SOURCES, index
+
+KINDS = {model: kind for kind, model in SOURCES.items()}
+
+
+def name_saved(sender, instance, raw=False, **kwargs):
+    if raw or index.built_at is None:
+        return
+    kind, pk, name = KINDS[sender], instance.pk, instance.name
+    transaction.on_commit(lambda: index.add(kind, pk, name))
+
+
+def name_deleted(sender, instance, **kwargs):
+    if index.built_at is None:
+        return
+    kind, pk = KINDS[sender], instance.pk
+    transaction.on_commit(lambda: index.remove(kind, pk))
+
+
+for model in SOURCES.values():
+    post_save.connect(name_saved, sender=model)
+    post_delete.connect(name_deleted, sender=model)
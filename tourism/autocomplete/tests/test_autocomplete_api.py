@@ -0,0 +1,112 @@
+"""Tests for the autocomplete API"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from autocomplete.index import build_lock, index
+from core.models import HotelAndResidence
+from place.models import Places
+
+AUTOCOMPLETE_URL = reverse('autocomplete:autocomplete')
+
+
+def create_place(admin, name):
+    """Create and return a sample place"""
+    return Places.objects.create(
+        admin_id=admin, name=name, address='address', type='TOURISM')
+
+
+def create_hotel(name):
+    """Create and return a sample hotel"""
+    return HotelAndResidence.objects.create(
+        name=name, address='address', facilities='facilities',
+        cost=Decimal('10.00'))
+
+
+class AutocompleteApiTests(TestCase):
+    """Test the autocomplete API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.\
+            create_superuser(  # type: ignore
+                email='admin@example.com',
+                password='testpass123',
+            )
+        self.museum = create_place(self.admin, 'National Museum')
+        create_place(self.admin, 'Milad Tower')
+        create_hotel('Grand Hotel')
+        create_hotel('Grand Hotel')
+        # rebuilt from the rows of this test on first use
+        index.built_at = None
+
+    def suggest(self, q):
+        response = self.client.get(AUTOCOMPLETE_URL, {'q': q})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(item['type'], item['name']) for item in response.data]
+
+    def test_prefix_matches_word_starts(self):
+        """Test q matches the start of any word, case-insensitively"""
+        self.assertEqual(self.suggest('mu'), [('place', 'National Museum')])
+        self.assertEqual(self.suggest('NAT'), [('place', 'National Museum')])
+        self.assertEqual(self.suggest('useum'), [])
+
+    def test_repeated_hotel_names_returned_once(self):
+        """Test the bookings of one hotel give a single suggestion"""
+        self.assertEqual(self.suggest('gra'), [('hotel', 'Grand Hotel')])
+
+    def test_hotel_suggestions_without_ids(self):
+        """Test booking ids are not exposed, place ids are"""
+        response = self.client.get(AUTOCOMPLETE_URL, {'q': 'gra'})
+        self.assertEqual(response.data, [  # type: ignore
+            {'type': 'hotel', 'name': 'Grand Hotel'}])
+
+        response = self.client.get(AUTOCOMPLETE_URL, {'q': 'nat'})
+        self.assertEqual(response.data, [{  # type: ignore
+            'type': 'place', 'id': self.museum.id, 'name': 'National Museum'}])
+
+    def test_no_query_after_build(self):
+        """Test suggestions are served without touching the database"""
+        self.suggest('m')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('mi'), [('place', 'Milad Tower')])
+
+    @override_settings(AUTOCOMPLETE_INDEX_TTL=0)
+    def test_expired_index_served_during_rebuild(self):
+        """Test requests keep the built index while another rebuilds it"""
+        self.suggest('m')
+
+        with build_lock, self.assertNumQueries(0):
+            self.assertEqual(self.suggest('mi'), [('place', 'Milad Tower')])
+
+    def test_index_follows_saves_and_deletes(self):
+        """Test saved and deleted names update the built index"""
+        self.suggest('m')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.museum.name = 'Carpet Museum'
+            self.museum.save()
+            create_place(self.admin, 'Azadi Tower')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('car'),
+                             [('place', 'Carpet Museum')])
+            self.assertEqual(self.suggest('nat'), [])
+            self.assertEqual(self.suggest('aza'), [('place', 'Azadi Tower')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.museum.delete()
+
+        self.assertEqual(self.suggest('car'), [])
+
+    def test_invalid_limit(self):
+        """Test an out of range limit is rejected"""
+        response = self.client.get(AUTOCOMPLETE_URL, {'q': 'm', 'limit': 0})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
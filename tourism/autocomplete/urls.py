@@ -0,0 +1,9 @@
+from django.urls import path
+from autocomplete import views
+
+app_name = 'autocomplete'
+
+
+urlpatterns = [
+    path('', views.AutocompleteView.as_view(), name='autocomplete'),
+]
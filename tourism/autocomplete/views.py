@@ -0,0 +1,41 @@
+"""Views for the autocomplete API"""
+
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from autocomplete.index import get_index
+from core.pagination import get_limit
+
+
+class AutocompleteView(APIView):
+    """Suggest place and hotel names as the user types.
+
+    ``?q=gra&limit=n`` returns up to n names having a word starting with
+    ``q``, case-insensitively, with the id of places. Answered from the
+    index of the worker, without a database query.
+    """
+    limit = 10
+    max_limit = 50
+    # kinds whose suggestions carry the row id
+    public_ids = {'place'}
+
+    def get(self, request):
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            return Response([])
+
+        limit = get_limit(request, self.limit, self.max_limit)
+        suggestions = get_index().search(q, limit)
+        return Response([self.suggestion(kind, pk, name)
+                         for kind, pk, name in suggestions])
+
+    def suggestion(self, kind, pk, name):
+        """Return a suggestion, with the id of places only
+
+        Hotels are indexed from the users' bookings, whose ids are not
+        for anonymous callers to see.
+        """
+        if kind in self.public_ids:
+            return {'type': kind, 'id': pk, 'name': name}
+
+        return {'type': kind, 'name': name}
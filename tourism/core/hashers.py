@@ -0,0 +1,18 @@
+"""
+Password hashers
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 hasher with the work factor of PASSWORD_PBKDF2_ITERATIONS
+
+    Keeps the ``pbkdf2_sha256`` algorithm so stored hashes stay valid.
+    A hash made with other iterations is reported by ``must_update`` and
+    rehashed by Django on the next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
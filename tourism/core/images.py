@@ -0,0 +1,194 @@
+"""
+Resized variants of the uploaded images
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage, storages
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save, pre_save
+from PIL import Image, ImageOps
+
+from core.models import ImageMetadata
+
+logger = logging.getLogger(__name__)
+
+# variant -> longest side in pixels, images are never upscaled
+VARIANTS = {
+    'thumb': 160,
+    'medium': 640,
+    'large': 1280,
+}
+
+# format -> (file extension, Pillow format, save options)
+FORMATS = {
+    'webp': ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', 'JPEG', {'quality': 82, 'optimize': True,
+                             'progressive': True}),
+}
+
+executor = ThreadPoolExecutor(max_workers=settings.IMAGE_VARIANT_WORKERS,
+                              thread_name_prefix='image-variants')
+
+# model -> name of its tracked image field
+tracked_fields = {}
+
+
+def variant_name(name, variant, image_format):
+    """Return the storage name of a variant of the image name
+
+    ``uploads/user/abc.png`` gives ``uploads/user/abc.thumb.webp``.
+    """
+    extension = FORMATS[image_format][0]
+    return f'{os.path.splitext(name)[0]}.{variant}.{extension}'
+
+
+def variant_names(name):
+    """Return {variant: {format: name}} of the image name"""
+    return {variant: {image_format: variant_name(name, variant, image_format)
+                      for image_format in FORMATS}
+            for variant in VARIANTS}
+
+
+def variant_storage():
+    """Return the storage of the variants
+
+    Variants are saved under their exact name, derived from the name of
+    the original, so they skip the content addressing of the uploads.
+    """
+    return storages['variants']
+
+
+def variant_urls(name, request=None):
+    """Return {variant: {format: url}} of the image name
+
+    The URLs are absolute when request is given.
+    """
+    storage = variant_storage()
+    urls = {}
+    for variant, names in variant_names(name).items():
+        urls[variant] = {}
+        for image_format, variant_file in names.items():
+            url = storage.url(variant_file)
+            urls[variant][image_format] = \
+                request.build_absolute_uri(url) if request else url
+
+    return urls
+
+
+def generate_variants(name, storage=default_storage):
+    """Write every variant of the image name stored in storage"""
+    with storage.open(name) as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    variants = variant_storage()
+    for variant, size in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        for image_format, (_, pillow_format, options) in FORMATS.items():
+            frame = resized
+            if pillow_format == 'JPEG' and frame.mode != 'RGB':
+                frame = frame.convert('RGB')
+            content = BytesIO()
+            frame.save(content, pillow_format, **options)
+
+            target = variant_name(name, variant, image_format)
+            # keep the deterministic name, storage would suffix a copy
+            if variants.exists(target):
+                variants.delete(target)
+            variants.save(target, ContentFile(content.getvalue()))
+
+
+def mark_variants_ready(name):
+    """Flag the rows whose image is name as having their variants"""
+    models = {model._meta.concrete_model: field
+              for model, field in tracked_fields.items()
+              if issubclass(model, ImageMetadata)}
+    for model, field in models.items():
+        model._default_manager.filter(**{field: name})\
+            .update(image_variants_ready=True)
+
+
+def _generate_in_background(name):
+    try:
+        generate_variants(name)
+        mark_variants_ready(name)
+    except Exception:
+        logger.exception('Could not generate the variants of %s', name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(name):
+    """Generate the variants of name in the background after commit"""
+    transaction.on_commit(lambda: executor.submit(
+        _generate_in_background, name))
+
+
+def dominant_color(image, background=(255, 255, 255)):
+    """Return the most common colour of image as #rrggbb
+
+    The image is shrunk in place before it is converted, JPEGs are even
+    decoded at the reduced size. Transparent pixels count as background.
+    """
+    image.thumbnail((64, 64))
+    if 'A' in image.getbands() or 'transparency' in image.info:
+        sample = image.convert('RGBA')
+        sample = Image.alpha_composite(
+            Image.new('RGBA', sample.size, background), sample)
+        sample = sample.convert('RGB')
+    else:
+        sample = image.convert('RGB')
+    sample = sample.quantize(colors=8)
+    count, index = max(sample.getcolors())
+    red, green, blue = sample.getpalette()[index * 3:index * 3 + 3]
+
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def read_metadata(file):
+    """Return width, height, size, sha256 and colour of an image file"""
+    sha256 = hashlib.sha256()
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+        # shrinks the image, read its size first
+        color = dominant_color(image)
+    file.seek(0)
+
+    return {'width': width, 'height': height, 'size': file.size,
+            'sha256': sha256.hexdigest(), 'color': color}
+
+
+def _remember_upload(sender, instance, raw=False, **kwargs):
+    # the upload is written to storage after pre_save, until then the
+    # file of a new upload is not committed
+    field_file = getattr(instance, tracked_fields[sender])
+    instance._image_uploaded = bool(
+        not raw and field_file and not field_file._committed)
+    if instance._image_uploaded and isinstance(instance, ImageMetadata):
+        instance.set_image_metadata(**read_metadata(field_file))
+        instance.image_variants_ready = False
+
+
+def _upload_saved(sender, instance, **kwargs):
+    if getattr(instance, '_image_uploaded', False):
+        schedule_variants(getattr(instance, tracked_fields[sender]).name)
+
+
+def track_uploads(model, field_name='image'):
+    """Generate the variants of the images uploaded to model.field_name"""
+    tracked_fields[model] = field_name
+    pre_save.connect(_remember_upload, sender=model)
+    post_save.connect(_upload_saved, sender=model)
@@ -0,0 +1,58 @@
+"""
+django command to store the metadata of images uploaded before it was kept
+"""
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core import images
+from core.models import ImageMetadata
+
+
+class Command(BaseCommand):
+    "Django command to read the metadata of stored images once"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows read from the database at once')
+
+    def handle(self, *args, **options):
+        """
+        Entrypoint for command
+        """
+        models = {model._meta.concrete_model: field
+                  for model, field in images.tracked_fields.items()
+                  if issubclass(model, ImageMetadata)}
+        batch_size = options['batch_size']
+        done = failed = 0
+        for model, field in models.items():
+            rows = model._default_manager.exclude(**{field: ''})\
+                .filter(image_sha256='').only('pk', field)
+            batch = []
+            for instance in rows.iterator(chunk_size=batch_size):
+                name = getattr(instance, field).name
+                try:
+                    with default_storage.open(name) as file:
+                        instance.set_image_metadata(
+                            **images.read_metadata(file))
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                    continue
+                batch.append(instance)
+                if len(batch) >= batch_size:
+                    done += self.store(model, batch)
+                    batch = []
+            done += self.store(model, batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored the metadata of {done} images, {failed} failed'))
+
+    def store(self, model, batch):
+        """Write the metadata columns of batch, return its length
+
+        bulk_update sends no signals, saving would invalidate caches and
+        update the clusters of every row for columns they do not read.
+        """
+        model._default_manager.bulk_update(
+            batch, model.IMAGE_METADATA_FIELDS)
+        return len(batch)
@@ -0,0 +1,52 @@
+"""
+django command to generate the missing variants of stored images
+"""
+from django.core.management.base import BaseCommand
+
+from core import images
+
+
+class Command(BaseCommand):
+    "Django command to write the resized variants of existing uploads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate variants that already exist')
+
+    def handle(self, *args, **options):
+        """
+        Entrypoint for command
+        """
+        done = failed = 0
+        for name in self.image_names():
+            if options['force'] or not self.has_variants(name):
+                try:
+                    images.generate_variants(name)
+                    done += 1
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                    continue
+            images.mark_variants_ready(name)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated the variants of {done} images, {failed} failed'))
+
+    def image_names(self):
+        """Yield the distinct image names of every tracked model"""
+        fields = {model._meta.concrete_model: field
+                  for model, field in images.tracked_fields.items()}
+        seen = set()
+        for model, field in fields.items():
+            names = model._default_manager.exclude(**{field: ''})\
+                .values_list(field, flat=True).distinct()
+            for name in names.iterator():
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+    def has_variants(self, name):
+        storage = images.variant_storage()
+        return all(storage.exists(variant_file)
+                   for names in images.variant_names(name).values()
+                   for variant_file in names.values())
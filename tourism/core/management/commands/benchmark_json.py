@@ -0,0 +1,80 @@
+"""
+django command to compare the JSON renderers on typical API payloads
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.models import HotelAndResidence, Reservation
+from core.renderers import ORJSONRenderer
+from place.models import TourismPlace
+from place.serializers import TourismSerializer
+from reservation.serializer import (
+    HotelAndResidenceSerializer,
+    ReservationSerializer,
+)
+
+
+class Command(BaseCommand):
+    "Django command to benchmark the stdlib and orjson JSON renderers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Number of items in each payload')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of timed runs of each renderer')
+
+    def handle(self, *args, **options):
+        """
+        Entrypoint for command
+        """
+        rows, repeat = options['rows'], options['repeat']
+        renderers = [('json', JSONRenderer()), ('orjson', ORJSONRenderer())]
+
+        # payloads are serialized once from unsaved rows, only the
+        # rendering is timed
+        for name, data in self.payloads(rows):
+            for renderer_name, renderer in renderers:
+                best = min(self.time(renderer, data) for _ in range(repeat))
+                size = len(renderer.render(data))
+                self.stdout.write(
+                    f'{name:>12} {renderer_name:>7}: {best * 1000:8.1f} ms '
+                    f'{rows / best:12.0f} items/s '
+                    f'{size / best / 2 ** 20:8.1f} MiB/s')
+
+    def payloads(self, rows):
+        now = timezone.now()
+        reservations = [
+            Reservation(id=i, title=f'trip {i}', type='HOTEL_AND_RESIDENCE',
+                        created_at=now, updated_at=now)
+            for i in range(rows)]
+        hotels = [
+            HotelAndResidence(
+                id=i, name=f'hotel {i}', address='Ferdowsi street',
+                facilities='pool, parking, breakfast', star=i % 5 + 1,
+                cost=Decimal(random.randint(1000, 99999)) / 100)
+            for i in range(rows)]
+        places = [
+            TourismPlace(
+                id=i, place_id_id=1, layer=TourismPlace.LAYER,
+                image=f'uploads/places/{i:02x}/{i:064x}.jpg',
+                location=Point(random.uniform(44, 63),
+                               random.uniform(25, 40), srid=4326))
+            for i in range(rows)]
+
+        return [
+            ('reservations',
+             ReservationSerializer(reservations, many=True).data),
+            ('hotels', HotelAndResidenceSerializer(hotels, many=True).data),
+            ('places', TourismSerializer(places, many=True).data),
+        ]
+
+    def time(self, renderer, data):
+        start = time.perf_counter()
+        renderer.render(data)
+        return time.perf_counter() - start
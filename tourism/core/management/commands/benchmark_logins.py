@@ -0,0 +1,51 @@
+"""
+django command to measure password verifications per second
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+
+class Command(BaseCommand):
+    "Django command to benchmark logins/s at PBKDF2 work factors"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, nargs='+',
+                            default=[150000, 320000, 600000],
+                            help='PBKDF2 iterations to measure')
+        parser.add_argument('--logins', type=int, default=50,
+                            help='Password checks per work factor')
+        parser.add_argument('--threads', type=int,
+                            default=os.cpu_count() or 1,
+                            help='Password checks run at once')
+
+    def handle(self, *args, **options):
+        """
+        Entrypoint for command
+        """
+        logins, threads = options['logins'], options['threads']
+        cores = min(threads, os.cpu_count() or 1)
+        self.stdout.write(f'{logins} logins, {threads} threads, '
+                          f'{cores} cores')
+
+        for iterations in options['iterations']:
+            with override_settings(PASSWORD_PBKDF2_ITERATIONS=iterations):
+                encoded = make_password('benchmark-password')
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    start = time.perf_counter()
+                    results = list(executor.map(
+                        lambda _: check_password('benchmark-password',
+                                                 encoded),
+                        range(logins)))
+                    elapsed = time.perf_counter() - start
+
+            assert all(results)
+            rate = logins / elapsed
+            self.stdout.write(
+                f'{iterations:>9} iterations: {rate:8.1f} logins/s  '
+                f'{rate / cores:8.1f} logins/s/core  '
+                f'{elapsed / logins * threads * 1000:7.1f} ms/login')
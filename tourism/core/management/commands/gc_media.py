@@ -0,0 +1,89 @@
+"""
+django command to delete the uploaded files no row refers to
+"""
+import os
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import FileField
+from django.utils import timezone
+
+from core import images
+
+
+class Command(BaseCommand):
+    "Django command to garbage collect orphaned media files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='uploads',
+                            help='Media directory to collect')
+        parser.add_argument('--min-age', type=int, default=60 * 60,
+                            help='Seconds a file is kept before it can be '
+                                 'collected, covers uploads being saved')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the orphaned files only')
+
+    def handle(self, *args, **options):
+        """
+        Entrypoint for command
+        """
+        referenced = self.referenced_names()
+        cutoff = timezone.now() - timedelta(seconds=options['min_age'])
+        orphans = [name for name in self.stored_names(options['prefix'])
+                   if name not in referenced and self.is_old(name, cutoff)]
+
+        collected = 0
+        for name in orphans:
+            if options['dry_run']:
+                self.stdout.write(name)
+            # an upload of the same content since the snapshot of the
+            # references touched the file, it is about to be referenced
+            elif self.is_old(name, cutoff):
+                default_storage.delete(name)
+            else:
+                continue
+            collected += 1
+
+        verb = 'Found' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {collected} orphaned files'))
+
+    def is_old(self, name, cutoff):
+        """Return True if name was last written before cutoff"""
+        try:
+            return default_storage.get_modified_time(name) < cutoff
+        except FileNotFoundError:
+            return False
+
+    def referenced_names(self):
+        """Return the file names stored in any file field and variants"""
+        names = set()
+        for model in apps.get_models():
+            if model._meta.proxy:
+                continue
+            for field in model._meta.concrete_fields:
+                if not isinstance(field, FileField):
+                    continue
+                if isinstance(field.default, str):
+                    names.add(field.default)
+                names.update(model._default_manager.exclude(
+                    **{field.attname: ''}).values_list(
+                    field.attname, flat=True).distinct().iterator())
+
+        for name in list(names):
+            for variant_files in images.variant_names(name).values():
+                names.update(variant_files.values())
+
+        return names
+
+    def stored_names(self, directory):
+        """Yield the names of the files stored under directory"""
+        if not default_storage.exists(directory):
+            return
+        subdirectories, files = default_storage.listdir(directory)
+        for name in files:
+            yield os.path.join(directory, name)
+        for subdirectory in subdirectories:
+            yield from self.stored_names(os.path.join(directory, subdirectory))
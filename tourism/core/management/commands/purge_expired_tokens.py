@@ -0,0 +1,41 @@
+"""
+django command to delete the expired auth tokens
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.authtoken.models import Token
+
+from user.authentication import expired_before
+
+
+class Command(BaseCommand):
+    "Django command to purge expired tokens in bounded batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of tokens deleted per transaction')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches')
+
+    def handle(self, *args, **options):
+        """
+        Entrypoint for command
+        """
+        batch_size, pause = options['batch_size'], options['sleep']
+        cutoff = expired_before()
+        expired = Token.objects.filter(created__lt=cutoff)
+        purged = 0
+        while True:
+            # each batch is its own short transaction, read through the
+            # index on created
+            keys = list(expired.values_list('pk', flat=True)[:batch_size])
+            if not keys:
+                break
+            deleted, _ = expired.filter(pk__in=keys).delete()
+            purged += deleted
+            if pause:
+                time.sleep(pause)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {purged} expired tokens'))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_user_phone_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='comment_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='reservation_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 15:20
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_comment_reservation_user_created_idx'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name='hotelandresidence',
+            name='stay',
+            field=django.contrib.postgres.fields.ranges.DateRangeField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='hotelandresidence',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('name', '='), ('stay', '&&')], name='exclude_overlapping_hotel_stays'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 16:05
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_hotelandresidence_stay'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AlterField(
+            model_name='hotelandresidence',
+            name='type_hotel',
+            field=models.CharField(choices=[('HOTEL', 'HOTEL'), ('RESIDENCE', 'RESIDENCE'), ('NOTSET', 'NOTSET')], default='NOTSET', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='hotelandresidence',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='hotel_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='hotelandresidence',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['address'], name='hotel_address_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='hotelandresidence',
+            index=models.Index(fields=['type_hotel', 'star', 'cost'], name='hotel_type_star_cost_idx'),
+        ),
+    ]
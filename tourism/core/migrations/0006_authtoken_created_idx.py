@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-18 17:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # the index is built concurrently, outside of a transaction
+    atomic = False
+
+    dependencies = [
+        ('authtoken', '0003_tokenproxy'),
+        ('core', '0005_hotelandresidence_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS '
+            'authtoken_token_created_idx ON authtoken_token (created);',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS '
+                        'authtoken_token_created_idx;',
+        ),
+    ]
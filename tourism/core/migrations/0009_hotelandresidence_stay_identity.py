@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 22:05
+
+import django.contrib.postgres.constraints
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_user_image_variants_ready'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='hotelandresidence',
+            name='exclude_overlapping_hotel_stays',
+        ),
+        migrations.AddConstraint(
+            model_name='hotelandresidence',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[(django.db.models.functions.text.Lower(models.Func(django.db.models.functions.text.Trim('name'), models.Value('\\s+'), models.Value(' '), models.Value('g'), function='REGEXP_REPLACE')), '='), (django.db.models.functions.text.Lower(models.Func(django.db.models.functions.text.Trim('address'), models.Value('\\s+'), models.Value(' '), models.Value('g'), function='REGEXP_REPLACE')), '='), ('stay', '&&')], name='exclude_overlapping_hotel_stays'),
+        ),
+    ]
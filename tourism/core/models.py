@@ -8,6 +8,10 @@ from django.conf import settings
 from django.core.validators import (
     MaxValueValidator, MinValueValidator, FileExtensionValidator)
 from django.db import models
+from django.db.models.functions import Lower, Trim
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
 
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -55,7 +59,38 @@ class UserManager(BaseUserManager):
 #     return 'images/{filename}'.format(filename=filename)
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class ImageMetadata(models.Model):
+    """Metadata of the ``image`` field, read once when it is uploaded
+
+    Saves opening the file to learn its size or colour. Empty until a
+    file is uploaded, see core.images.track_uploads.
+    """
+    IMAGE_METADATA_FIELDS = ['image_width', 'image_height', 'image_size',
+                             'image_sha256', 'image_color']
+
+    image_width = models.PositiveIntegerField(null=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, editable=False)
+    image_size = models.PositiveBigIntegerField(null=True, editable=False)
+    image_sha256 = models.CharField(max_length=64, blank=True, default='',
+                                    editable=False)
+    # dominant colour as #rrggbb
+    image_color = models.CharField(max_length=7, blank=True, default='',
+                                   editable=False)
+    # set once the background job wrote the resized variants of the image
+    image_variants_ready = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def set_image_metadata(self, width, height, size, sha256, color):
+        self.image_width = width
+        self.image_height = height
+        self.image_size = size
+        self.image_sha256 = sha256
+        self.image_color = color
+
+
+class User(AbstractBaseUser, PermissionsMixin, ImageMetadata):
     """user in the system"""
     email = models.EmailField(max_length=254, unique=True)
     first_name = models.CharField(max_length=50)
@@ -93,6 +128,12 @@ class Comment(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
                              on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'],
+                         name='comment_user_created_idx'),
+        ]
+
     def __str__(self):
         return self.feedback
 
@@ -112,10 +153,23 @@ class Reservation(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'],
+                         name='reservation_user_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
 
+def normalized(field_name):
+    """Return the field lower cased with its whitespace collapsed"""
+    return Lower(models.Func(
+        Trim(field_name), models.Value(r'\s+'), models.Value(' '),
+        models.Value('g'), function='REGEXP_REPLACE'))
+
+
 class HotelAndResidence(models.Model):
     name = models.CharField(max_length=50)
 
@@ -125,7 +179,7 @@ class HotelAndResidence(models.Model):
         ('NOTSET', 'NOTSET')
     )
     type_hotel = models.CharField(max_length=10, choices=Ho,
-                                  default="NOTSET", db_index=True)
+                                  default="NOTSET")
     address = models.CharField(max_length=100)
     facilities = models.TextField(max_length=500)
     star = models.SmallIntegerField(
@@ -134,10 +188,42 @@ class HotelAndResidence(models.Model):
         max_digits=5, decimal_places=2, verbose_name='Cost per night')
     reservation = models.ForeignKey(
         'Reservation', on_delete=models.CASCADE, null=True, blank=True)
+    # nights booked, check-out day excluded
+    stay = DateRangeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # a hotel is its name and address, whatever their case and
+            # spacing, see HotelAndResidence.identity()
+            ExclusionConstraint(
+                name='exclude_overlapping_hotel_stays',
+                expressions=[
+                    (normalized('name'), RangeOperators.EQUAL),
+                    (normalized('address'), RangeOperators.EQUAL),
+                    ('stay', RangeOperators.OVERLAPS),
+                ],
+            ),
+        ]
+        indexes = [
+            # trigram indexes for the similarity search on name/address
+            GinIndex(name='hotel_name_trgm', fields=['name'],
+                     opclasses=['gin_trgm_ops']),
+            GinIndex(name='hotel_address_trgm', fields=['address'],
+                     opclasses=['gin_trgm_ops']),
+            # also serves type_hotel alone, replacing its own index
+            models.Index(name='hotel_type_star_cost_idx',
+                         fields=['type_hotel', 'star', 'cost']),
+        ]
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def identity():
+        """Return the annotations identifying a hotel across bookings"""
+        return {'hotel_name': normalized('name'),
+                'hotel_address': normalized('address')}
+
 
 class TouristTour(models.Model):
     name = models.CharField(max_length=50)
@@ -0,0 +1,53 @@
+"""Paginations and result limits shared by the API views"""
+
+from collections import OrderedDict
+
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+
+
+def get_limit(request, default, maximum):
+    """Return the number of results requested with ?limit="""
+    limit = request.query_params.get('limit', default)
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+    if not 0 < limit <= maximum:
+        raise ParseError(f'limit must be from 1 to {maximum}')
+
+    return limit
+
+
+class IdCursorPagination(CursorPagination):
+    """Paginate by descending primary key, newest first"""
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class CreatedAtCursorPagination(IdCursorPagination):
+    """Paginate by creation time, newest first"""
+    ordering = ('-created_at', '-id')
+
+
+class RankPagination(LimitOffsetPagination):
+    """Paginate results ordered by a float rank by offset
+
+    A cursor would hold the rank as text and compare it again as a
+    float, ties and the round trip could repeat or drop rows.
+    """
+    max_limit = 1000
+
+
+class GeoJsonCursorPagination(IdCursorPagination):
+    """Keep paginated GeoJSON lists a valid FeatureCollection"""
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('type', 'FeatureCollection'),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('features', data['features']),
+        ]))
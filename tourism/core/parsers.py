@@ -0,0 +1,25 @@
+"""
+JSON parser of the API built on orjson
+"""
+import codecs
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser decoding with orjson"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            content = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f'JSON parse error - {exc}')
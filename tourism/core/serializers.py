@@ -0,0 +1,22 @@
+"""
+Serializer fields shared by the API apps
+"""
+from rest_framework import serializers
+
+from core.images import variant_urls
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """URLs of the resized variants of an image field
+
+    Returns ``{variant: {format: url}}``, or None when there is no image
+    or its variants are not written yet, e.g. while the background job
+    runs, after it failed or for a default image never uploaded.
+    """
+
+    def to_representation(self, value):
+        if not value or not getattr(
+                value.instance, 'image_variants_ready', False):
+            return None
+
+        return variant_urls(value.name, self.context.get('request'))
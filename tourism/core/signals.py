@@ -0,0 +1,6 @@
+"""Signal handlers for the core app"""
+
+from core import images
+from core.models import User
+
+images.track_uploads(User)
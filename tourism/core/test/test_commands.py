@@ -1,13 +1,18 @@
 """
 test custom django management command
 """
+from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -36,3 +41,31 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+class PurgeExpiredTokensTests(TestCase):
+    """
+    Test purging expired tokens
+    """
+
+    def test_purge_expired_tokens(self):
+        """
+        Test only expired tokens are deleted, batch by batch
+        """
+        tokens = []
+        for i in range(5):
+            user = get_user_model().objects.create_user(  # type: ignore
+                email=f'user{i}@example.com',
+                password='testpass123',
+                phone_number=f'0914563257{i}',
+            )
+            tokens.append(Token.objects.create(user=user))
+        Token.objects.filter(pk__in=[t.pk for t in tokens[:3]]).update(
+            created=timezone.now() - timedelta(days=365))
+
+        out = StringIO()
+        call_command('purge_expired_tokens', batch_size=2, stdout=out)
+
+        self.assertCountEqual(Token.objects.values_list('pk', flat=True),
+                              [t.pk for t in tokens[3:]])
+        self.assertIn('Purged 3 expired tokens', out.getvalue())
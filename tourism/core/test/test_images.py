@@ -0,0 +1,158 @@
+"""
+test the image variants pipeline
+"""
+import hashlib
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import Mock, patch
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+
+from core import images
+from core.serializers import ImageVariantsField
+
+
+def image_content(size=(2000, 1000), image_format='PNG'):
+    """Return the bytes of a sample image"""
+    content = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(content, image_format)
+    return content.getvalue()
+
+
+class ImageVariantsTests(TestCase):
+    """Test resizing and tracking uploaded images"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def variant_size(self, name, variant, image_format):
+        variant_file = images.variant_name(name, variant, image_format)
+        with images.variant_storage().open(variant_file) as f:
+            return Image.open(f).size
+
+    def test_generate_variants(self):
+        """Test every variant is written in every format, never upscaled"""
+        name = default_storage.save('uploads/user/sample.png',
+                                    ContentFile(image_content()))
+
+        images.generate_variants(name)
+
+        self.assertEqual(self.variant_size(name, 'thumb', 'webp'), (160, 80))
+        self.assertEqual(self.variant_size(name, 'large', 'jpeg'),
+                         (1280, 640))
+
+        small = default_storage.save('uploads/user/small.png',
+                                     ContentFile(image_content((100, 50))))
+        images.generate_variants(small)
+        self.assertEqual(self.variant_size(small, 'medium', 'webp'),
+                         (100, 50))
+
+    def test_variant_urls(self):
+        """Test the variant URLs follow the image name"""
+        urls = images.variant_urls('uploads/user/sample.png')
+
+        self.assertEqual(urls['thumb']['webp'],
+                         '/static/media/uploads/user/sample.thumb.webp')
+        self.assertEqual(set(urls), set(images.VARIANTS))
+
+    @patch('core.images.schedule_variants')
+    def test_upload_schedules_variants(self, patched_schedule):
+        """Test only saves with a new upload schedule the variants"""
+        user = get_user_model().objects.create_user(  # type: ignore
+            email='test@example.com',
+            password='testpass123',
+            phone_number='09145632578',
+        )
+        patched_schedule.assert_not_called()
+
+        user.image = SimpleUploadedFile('me.png', image_content())
+        user.save()
+        patched_schedule.assert_called_once_with(user.image.name)
+
+        user.first_name = 'test'
+        user.save()
+        patched_schedule.assert_called_once()
+
+    def test_variant_urls_once_ready(self):
+        """Test variant URLs are only returned once the files exist"""
+        user = get_user_model().objects.create_user(  # type: ignore
+            email='test@example.com',
+            password='testpass123',
+            phone_number='09145632578',
+        )
+        field = ImageVariantsField()
+        self.assertIsNone(field.to_representation(user.image))
+
+        user.image = SimpleUploadedFile('me.png', image_content())
+        user.save()
+        self.assertIsNone(field.to_representation(user.image))
+
+        images.generate_variants(user.image.name)
+        images.mark_variants_ready(user.image.name)
+        user.refresh_from_db()
+
+        self.assertEqual(field.to_representation(user.image),
+                         images.variant_urls(user.image.name))
+
+    def test_upload_stores_metadata(self):
+        """Test the metadata of an upload is read once and stored"""
+        content = image_content((300, 200))
+        user = get_user_model().objects.create_user(  # type: ignore
+            email='test@example.com',
+            password='testpass123',
+            phone_number='09145632578',
+        )
+        self.assertIsNone(user.image_width)
+
+        user.image = SimpleUploadedFile('me.png', content)
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual((user.image_width, user.image_height), (300, 200))
+        self.assertEqual(user.image_size, len(content))
+        self.assertEqual(user.image_sha256,
+                         hashlib.sha256(content).hexdigest())
+        self.assertEqual(user.image_color, '#c81e1e')
+
+    def test_dominant_color_of_transparent_image(self):
+        """Test transparent pixels count as the background, not black"""
+        image = Image.new('RGBA', (500, 500), (0, 0, 0, 0))
+
+        self.assertEqual(images.dominant_color(image), '#ffffff')
+
+    def test_backfill_metadata_without_signals(self):
+        """Test the backfill stores metadata without saving the rows"""
+        User = get_user_model()
+        user = User.objects.create_user(  # type: ignore
+            email='test@example.com',
+            password='testpass123',
+            phone_number='09145632578',
+            image=SimpleUploadedFile('me.png', image_content((300, 200))),
+        )
+        User.objects.filter(pk=user.pk).update(
+            image_width=None, image_height=None, image_sha256='')
+        saved = Mock()
+        post_save.connect(saved, sender=User, weak=False)
+        self.addCleanup(post_save.disconnect, saved, sender=User)
+
+        call_command('backfill_image_metadata', stdout=StringIO())
+
+        user.refresh_from_db()
+        self.assertEqual((user.image_width, user.image_height), (300, 200))
+        saved.assert_not_called()
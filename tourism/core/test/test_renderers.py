@@ -0,0 +1,107 @@
+"""
+test the orjson renderer and parser
+"""
+import datetime
+import io
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """
+    Test the renderer matches DRF's JSONRenderer
+    """
+
+    def test_render_like_drf(self):
+        """
+        Test decimals, lazy strings and datetimes render like DRF
+        """
+        data = {
+            'cost': Decimal('12.50'),
+            'label': _('HOTEL'),
+            'created_at': datetime.datetime(
+                2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2024, 5, 1),
+            'ids': {3},
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data),
+                         JSONRenderer().render(data))
+
+    def test_render_line_separators_like_drf(self):
+        """
+        Test U+2028 and U+2029 are escaped like DRF does
+        """
+        data = {'detail': 'one\u2028two\u2029three'}
+
+        rendered = ORJSONRenderer().render(data)
+
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        self.assertIn(b'\\u2028', rendered)
+
+    def test_render_datetime_microseconds(self):
+        """
+        Test datetimes keep their microseconds, DRF cuts them to
+        milliseconds
+        """
+        data = {'at': datetime.datetime(
+            2024, 5, 1, 12, 30, 0, 123456, tzinfo=datetime.timezone.utc)}
+
+        self.assertEqual(ORJSONRenderer().render(data),
+                         b'{"at":"2024-05-01T12:30:00.123456Z"}')
+        self.assertEqual(JSONRenderer().render(data),
+                         b'{"at":"2024-05-01T12:30:00.123Z"}')
+
+    def test_render_geometry(self):
+        """
+        Test GEOS geometries render as GeoJSON
+        """
+        rendered = ORJSONRenderer().render({'location': Point(51.4, 35.7)})
+
+        self.assertEqual(
+            rendered,
+            b'{"location":{"type":"Point","coordinates":[51.4,35.7]}}')
+
+    def test_render_indent(self):
+        """
+        Test an indent requested in the media type pretty prints
+        """
+        rendered = ORJSONRenderer().render(
+            {'a': 1}, 'application/json; indent=4')
+
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_render_none(self):
+        """
+        Test no data renders an empty body
+        """
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    """
+    Test the orjson parser
+    """
+
+    def test_parse(self):
+        """
+        Test a JSON body is parsed
+        """
+        data = ORJSONParser().parse(io.BytesIO('{"name": "هتل"}'.encode()))
+
+        self.assertEqual(data, {'name': 'هتل'})
+
+    def test_parse_error(self):
+        """
+        Test invalid JSON raises a ParseError
+        """
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": '))
@@ -0,0 +1,83 @@
+"""
+test the content addressed media storage
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Test uploads are stored once per content"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_name_is_content_hash(self):
+        """Test files are named by the sha256 of their content"""
+        digest = hashlib.sha256(b'image').hexdigest()
+
+        name = default_storage.save('uploads/user/photo.PNG',
+                                    ContentFile(b'image'))
+
+        self.assertEqual(name, f'uploads/user/{digest[:2]}/{digest}.png')
+
+    def test_duplicate_upload_stored_once(self):
+        """Test identical uploads share one file"""
+        first = default_storage.save('uploads/user/a.png',
+                                     ContentFile(b'image'))
+        second = default_storage.save('uploads/user/b.png',
+                                      ContentFile(b'image'))
+        other = default_storage.save('uploads/user/c.png',
+                                     ContentFile(b'other image'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        directory = os.path.dirname(os.path.join(self.media_root, first))
+        self.assertEqual(os.listdir(directory), [os.path.basename(first)])
+
+    def test_gc_media_deletes_orphans(self):
+        """Test only files no row refers to are collected"""
+        user = get_user_model().objects.create_user(  # type: ignore
+            email='test@example.com',
+            password='testpass123',
+            phone_number='09145632578',
+            image=SimpleUploadedFile('me.png', b'kept image'),
+        )
+        orphan = default_storage.save('uploads/user/old.png',
+                                      ContentFile(b'orphan image'))
+
+        out = StringIO()
+        call_command('gc_media', min_age=0, stdout=out)
+
+        self.assertTrue(default_storage.exists(user.image.name))
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertIn('Deleted 1 orphaned files', out.getvalue())
+
+    def test_duplicate_upload_refreshes_orphan(self):
+        """Test an upload reusing an old orphan keeps it from collection"""
+        name = default_storage.save('uploads/user/a.png',
+                                    ContentFile(b'image'))
+        two_hours_ago = time.time() - 2 * 60 * 60
+        os.utime(default_storage.path(name), (two_hours_ago, two_hours_ago))
+
+        default_storage.save('uploads/user/b.png', ContentFile(b'image'))
+        call_command('gc_media', stdout=StringIO())
+
+        self.assertTrue(default_storage.exists(name))
@@ -0,0 +1,73 @@
+"""
+test serving the uploaded media
+"""
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+
+
+def media_url(path):
+    """Create and return the url of a media file"""
+    return reverse('media', args=[path])
+
+
+class ServeMediaTests(TestCase):
+    """Test media is served by Django or handed to nginx"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.name = default_storage.save('uploads/user/me.png',
+                                         ContentFile(b'image'))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    @override_settings(MEDIA_SERVE_MODE='accel')
+    def test_accel_redirect(self):
+        """Test nginx is told to send the file"""
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Accel-Redirect'],
+                         f'/protected-media/{self.name}')
+        self.assertEqual(res['Content-Type'], 'image/png')
+        self.assertIn('immutable', res['Cache-Control'])
+        self.assertEqual(res.content, b'')
+
+    @override_settings(MEDIA_SERVE_MODE='django')
+    def test_served_by_django(self):
+        """Test the file is streamed by Django in development"""
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(res.streaming_content), b'image')
+        self.assertIn('max-age=31536000', res['Cache-Control'])
+
+    @override_settings(MEDIA_SERVE_MODE='accel')
+    def test_path_outside_media_rejected(self):
+        """Test paths leaving the media root are not handed to nginx"""
+        for path in ['uploads/../../settings.py', '.env', 'uploads/.x']:
+            res = self.client.get(media_url(path))
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertNotIn('X-Accel-Redirect', res)
+
+    @override_settings(MEDIA_SERVE_MODE='accel')
+    def test_renamable_files_cached_briefly(self):
+        """Test files rewritten under their name are not immutable"""
+        variant = self.name.replace('.png', '.thumb.webp')
+        for path in ['default.jpeg', variant]:
+            res = self.client.get(media_url(path))
+
+            self.assertNotIn('immutable', res['Cache-Control'])
+            self.assertIn('max-age=300', res['Cache-Control'])
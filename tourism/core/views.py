@@ -0,0 +1,58 @@
+"""
+Views serving the uploaded media
+"""
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+# originals named by ContentAddressedStorage, their bytes never change
+CONTENT_ADDRESSED = re.compile(
+    r'^uploads/(?:.+/)?[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+$')
+
+
+def media_path(path):
+    """Return the normalized media path, or raise Http404 if it leaves
+    MEDIA_ROOT or names a hidden file"""
+    path = posixpath.normpath(path).lstrip('/')
+    parts = path.split('/')
+    if path in ('', '.') or any(part.startswith('.') for part in parts):
+        raise Http404('Media not found')
+
+    return path
+
+
+def serve_media(request, path):
+    """Serve an uploaded file
+
+    With ``MEDIA_SERVE_MODE = 'accel'`` Django only checks the path and
+    answers with an ``X-Accel-Redirect`` to the internal nginx location
+    ``MEDIA_ACCEL_PREFIX``; nginx sends the file itself with sendfile.
+    With ``'django'`` the file is streamed by Django, for development.
+    Content addressed uploads are cached as immutable for
+    ``MEDIA_CACHE_MAX_AGE`` seconds; other files, like the default image
+    or the variants rewritten under the same name, only for
+    ``MEDIA_MUTABLE_CACHE_MAX_AGE`` seconds.
+    """
+    path = media_path(path)
+    if settings.MEDIA_SERVE_MODE == 'accel':
+        content_type, encoding = mimetypes.guess_type(path)
+        response = HttpResponse(
+            content_type=content_type or 'application/octet-stream')
+        response['X-Accel-Redirect'] = \
+            settings.MEDIA_ACCEL_PREFIX + quote(path)
+    else:
+        response = serve(request, path, document_root=settings.MEDIA_ROOT)
+
+    if CONTENT_ADDRESSED.match(path):
+        patch_cache_control(response, public=True, immutable=True,
+                            max_age=settings.MEDIA_CACHE_MAX_AGE)
+    else:
+        patch_cache_control(response, public=True,
+                            max_age=settings.MEDIA_MUTABLE_CACHE_MAX_AGE)
+    return response
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'user',
     'place',
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'drf_spectacular',
     'reservation',
+    'autocomplete',
     'django_filters',
     'corsheaders',
     'django.contrib.gis',
@@ -128,6 +130,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+PASSWORD_HASHERS = [
+    'core.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# PBKDF2 work factor of new password hashes, older hashes are rehashed on
+# login. See `manage.py benchmark_logins` for the logins/s it allows
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 600000))
+
+# Threads verifying passwords for the async login view, per worker process
+LOGIN_HASH_WORKERS = int(
+    os.environ.get('LOGIN_HASH_WORKERS', os.cpu_count() or 1))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -151,6 +170,32 @@ MEDIA_URL = '/static/media/'
 MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
+# Uploads are named by their content hash so identical files are stored
+# once, the resized variants keep names derived from their original
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+    },
+    'variants': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# 'accel' hands media downloads to nginx through X-Accel-Redirect to the
+# internal location MEDIA_ACCEL_PREFIX, 'django' streams them from Django
+# and is only the default while DEBUG, for the development server
+MEDIA_SERVE_MODE = os.environ.get('MEDIA_SERVE_MODE',
+                                  'django' if DEBUG else 'accel')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Seconds browsers and proxies may cache a content addressed upload, and
+# any other media file, whose content may change under the same name
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_MUTABLE_CACHE_MAX_AGE = 60 * 5
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -161,6 +206,17 @@ AUTH_USER_MODEL = 'core.User'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.IdCursorPagination',
+    'PAGE_SIZE': 100,
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 
     "ENUM_NAME_OVERRIDES": {
         "Type": "Type7e5Enum"
@@ -171,6 +227,58 @@ SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
 
+# Cache shared by every worker and management command when REDIS_URL is
+# set. Without it each process has its own memory cache, which never sees
+# the invalidations made by the other processes.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Seconds a rendered vector tile of a place layer stays cached. Tiles are
+# invalidated through the cache, so a per process cache only keeps them
+# for a few minutes to bound how long other workers serve stale tiles.
+PLACE_TILE_CACHE_TIMEOUT = 60 * 60 * 24 if REDIS_URL else 60 * 5
+
+# Zoom levels up to this one are clustered from the PlaceCluster table,
+# updated incrementally on every place change; finer zoom levels are grouped
+# per request
+PLACE_CLUSTER_PRECOMPUTED_ZOOM = 8
+
+# Decimals kept in coordinates of the GeoJSON built by the database
+PLACE_GEOJSON_PRECISION = 6
+
+# Seconds an auth token is accepted after its creation, logging in again
+# replaces an expired token
+AUTH_TOKEN_TTL = 60 * 60 * 24 * 30
+
+# Token -> user lookups of user.authentication.CachedTokenAuthentication:
+# entries kept per worker, seconds an entry lives and the cache alias shared
+# by the workers. Without a shared cache other workers only notice a deleted
+# token or deactivated user once their entry expires.
+AUTH_TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'SHARED_CACHE': 'default' if REDIS_URL else None,
+}
+
+# Threads per worker process writing the resized variants of new uploads
+IMAGE_VARIANT_WORKERS = 2
+
+# Seconds before a worker rebuilds its autocomplete index from the database,
+# picking up the names saved by the other workers
+AUTOCOMPLETE_INDEX_TTL = 60 * 5
+
 CORS_ALLOWED_ORIGINS = ['http://localhost:8000', 'http://localhost:8050',]
 
 # GDAL_LIBRARY_PATH = '/usr/local/lib/libgdal.so'
@@ -19,9 +19,10 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -31,11 +32,8 @@ urlpatterns = [
     path('api/user/', include('user.urls')),
     path('api/reservation/', include('reservation.urls')),
     path('api/places/', include('place.urls')),
+    path('api/autocomplete/', include('autocomplete.urls')),
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$', serve_media,
+            name='media'),
 
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT,
-    )
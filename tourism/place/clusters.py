@@ -0,0 +1,193 @@
+"""Grid clustering of the place layers per zoom level
+
+A point belongs to the cell ``floor(lon / size), floor(lat / size)`` of
+its zoom level, where ``size`` splits each web map tile into
+``CELLS_PER_TILE`` columns. Coarse zoom levels are precomputed into
+``PlaceCluster`` and updated cell by cell with the difference a changed
+point makes; finer levels are grouped on the fly.
+"""
+import math
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.gis.db.models.aggregates import Collect
+from django.contrib.gis.db.models.functions import Centroid
+from django.db import connection, transaction
+from django.db.models import Count, FloatField, Func, Q
+from django.db.models.functions import Floor
+
+from .models import LAYERS, PlaceCluster
+from .sql import quote_column, quote_table
+
+CELLS_PER_TILE = 4
+
+REBUILD_SQL = """
+INSERT INTO {clusters} ({c_layer}, {c_zoom}, {c_x}, {c_y}, {c_count},
+                        {c_location})
+SELECT %(layer)s, grid.zoom,
+       floor(ST_X(layer.{location}) / grid.size),
+       floor(ST_Y(layer.{location}) / grid.size),
+       count(*), ST_Centroid(ST_Collect(layer.{location}))
+FROM {table} AS layer
+CROSS JOIN (
+    SELECT zoom, 360.0 / (2 ^ zoom) / %(cells)s AS size
+    FROM generate_series(0, %(max_zoom)s) AS zoom
+) AS grid
+WHERE layer.{layer} = %(layer_type)s
+GROUP BY 2, 3, 4
+"""
+
+ADD_SQL = """
+INSERT INTO {clusters} AS cluster ({c_layer}, {c_zoom}, {c_x}, {c_y},
+                                   {c_count}, {c_location})
+SELECT %s, delta.zoom, delta.x, delta.y, delta.count,
+       ST_SetSRID(ST_MakePoint(delta.sum_x / delta.count,
+                               delta.sum_y / delta.count), 4326)
+FROM (VALUES {values}) AS delta(zoom, x, y, count, sum_x, sum_y)
+ON CONFLICT ({c_layer}, {c_zoom}, {c_x}, {c_y}) DO UPDATE SET
+    {c_count} = cluster.{c_count} + EXCLUDED.{c_count},
+    {c_location} = ST_SetSRID(ST_MakePoint(
+        (ST_X(cluster.{c_location}) * cluster.{c_count}
+         + ST_X(EXCLUDED.{c_location}) * EXCLUDED.{c_count})
+        / (cluster.{c_count} + EXCLUDED.{c_count}),
+        (ST_Y(cluster.{c_location}) * cluster.{c_count}
+         + ST_Y(EXCLUDED.{c_location}) * EXCLUDED.{c_count})
+        / (cluster.{c_count} + EXCLUDED.{c_count})), 4326)
+"""
+
+SUBTRACT_SQL = """
+UPDATE {clusters} AS cluster SET
+    {c_count} = GREATEST(cluster.{c_count} + delta.count, 0),
+    {c_location} = CASE WHEN cluster.{c_count} + delta.count > 0
+        THEN ST_SetSRID(ST_MakePoint(
+            (ST_X(cluster.{c_location}) * cluster.{c_count} + delta.sum_x)
+            / (cluster.{c_count} + delta.count),
+            (ST_Y(cluster.{c_location}) * cluster.{c_count} + delta.sum_y)
+            / (cluster.{c_count} + delta.count)), 4326)
+        ELSE cluster.{c_location} END
+FROM (VALUES {values}) AS delta(zoom, x, y, count, sum_x, sum_y)
+WHERE cluster.{c_layer} = %s
+  AND cluster.{c_zoom} = delta.zoom
+  AND cluster.{c_x} = delta.x
+  AND cluster.{c_y} = delta.y
+"""
+
+DELTA_ROW = '(%s, %s, %s, %s, %s::double precision, %s::double precision)'
+
+
+def cell_size(zoom):
+    """Return the width of a grid cell in degrees at the zoom level"""
+    return 360.0 / 2 ** zoom / CELLS_PER_TILE
+
+
+def is_precomputed(zoom):
+    """Return True if the zoom level is served from PlaceCluster"""
+    return zoom <= settings.PLACE_CLUSTER_PRECOMPUTED_ZOOM
+
+
+def _cells(point):
+    """Yield (zoom, x, y, size) of the precomputed cells holding point"""
+    for zoom in range(settings.PLACE_CLUSTER_PRECOMPUTED_ZOOM + 1):
+        size = cell_size(zoom)
+        yield (zoom, math.floor(point.x / size),
+               math.floor(point.y / size), size)
+
+
+def _format(sql, model, values=''):
+    return sql.format(
+        clusters=quote_table(PlaceCluster),
+        c_layer=quote_column(PlaceCluster, 'layer'),
+        c_zoom=quote_column(PlaceCluster, 'zoom'),
+        c_x=quote_column(PlaceCluster, 'cell_x'),
+        c_y=quote_column(PlaceCluster, 'cell_y'),
+        c_count=quote_column(PlaceCluster, 'count'),
+        c_location=quote_column(PlaceCluster, 'location'),
+        table=quote_table(model),
+        location=quote_column(model, 'location'),
+        layer=quote_column(model, 'layer'),
+        values=values,
+    )
+
+
+def cluster_queryset(queryset, zoom):
+    """Group the points of queryset into the grid cells of zoom"""
+    size = cell_size(zoom)
+    rows = queryset.annotate(
+        cell_x=Floor(Func('location', function='ST_X',
+                          output_field=FloatField()) / size),
+        cell_y=Floor(Func('location', function='ST_Y',
+                          output_field=FloatField()) / size),
+    ).values('cell_x', 'cell_y').annotate(
+        count=Count('pk'),
+        centroid=Centroid(Collect('location')),
+    ).order_by()
+
+    return [PlaceCluster(zoom=zoom, cell_x=int(row['cell_x']),
+                         cell_y=int(row['cell_y']), count=row['count'],
+                         location=row['centroid']) for row in rows]
+
+
+def rebuild(layer):
+    """Recompute every precomputed cluster of the layer"""
+    model = LAYERS[layer]
+    with transaction.atomic(), connection.cursor() as cursor:
+        PlaceCluster.objects.filter(layer=layer).delete()
+        cursor.execute(_format(REBUILD_SQL, model), {
+            'layer': layer,
+            'layer_type': model.LAYER,
+            'cells': CELLS_PER_TILE,
+            'max_zoom': settings.PLACE_CLUSTER_PRECOMPUTED_ZOOM,
+        })
+
+
+def _deltas(added, removed):
+    """Return sorted (zoom, x, y, count, sum_x, sum_y) cell changes"""
+    deltas = {}
+    for points, sign in ((added, 1), (removed, -1)):
+        for point in points:
+            if point is None:
+                continue
+            for zoom, x, y, size in _cells(point):
+                delta = deltas.setdefault((zoom, x, y), [0, 0.0, 0.0])
+                delta[0] += sign
+                delta[1] += sign * point.x
+                delta[2] += sign * point.y
+
+    return [(*cell, *delta) for cell, delta in sorted(deltas.items())
+            if any(delta)]
+
+
+def _execute(cursor, sql, model, deltas, params):
+    values = ', '.join([DELTA_ROW] * len(deltas))
+    cursor.execute(_format(sql, model, values),
+                   params(value for delta in deltas for value in delta))
+
+
+def update(layer, added=(), removed=()):
+    """Move the precomputed clusters by the points added and removed
+
+    Each cell of the points gets its count and centroid adjusted in
+    place, a point moving within a cell only shifts the centroid. Cells
+    are written in a fixed order with ``ON CONFLICT`` so concurrent
+    saves in one cell add up instead of failing; cells left empty are
+    dropped.
+    """
+    deltas = _deltas(added, removed)
+    if not deltas:
+        return
+
+    grown = [delta for delta in deltas if delta[3] > 0]
+    shrunk = [delta for delta in deltas if delta[3] <= 0]
+    model = LAYERS[layer]
+    with transaction.atomic(), connection.cursor() as cursor:
+        if grown:
+            _execute(cursor, ADD_SQL, model, grown,
+                     lambda values: [layer, *values])
+        if shrunk:
+            _execute(cursor, SUBTRACT_SQL, model, shrunk,
+                     lambda values: [*values, layer])
+            PlaceCluster.objects.filter(
+                reduce(or_, (Q(zoom=zoom, cell_x=x, cell_y=y)
+                             for zoom, x, y, *_ in shrunk)),
+                layer=layer, count=0).delete()
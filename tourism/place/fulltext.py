@@ -0,0 +1,26 @@
+"""Full-text search of places by name and address
+
+``Places.search_vector`` holds the stemmed lexemes of the name (weight A)
+and address (weight B) and is maintained by a database trigger, so
+searches only read the (type, search_vector) GIN index.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+# text search configuration of the trigger building search_vector
+SEARCH_CONFIG = 'english'
+
+
+def search_places(queryset, text, place_type=None):
+    """Return the places of queryset matching text, best ranked first
+
+    text uses the web search syntax: words, "quoted phrases", ``or``
+    and ``-excluded`` words.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    queryset = queryset.filter(search_vector=query)
+    if place_type is not None:
+        queryset = queryset.filter(type=place_type)
+
+    return queryset.annotate(rank=SearchRank(F('search_vector'), query))\
+        .order_by('-rank', '-id')
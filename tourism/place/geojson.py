@@ -0,0 +1,91 @@
+"""Incremental GeoJSON encoding for the place APIs"""
+
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.db import connection
+from django.db.models import F
+from core.images import FORMATS, VARIANTS
+from core.renderers import dumps
+
+CHUNK_SIZE = 2000
+
+# {variant: {format: url}} of feature.image, see core.images.variant_name
+VARIANTS_SQL = 'json_build_object({})'.format(', '.join(
+    "'{}', json_build_object({})".format(variant, ', '.join(
+        f"'{image_format}', media.url || regexp_replace("
+        f"feature.image, '\\.[^./]*$', '') || '.{variant}.{extension}'"
+        for image_format, (extension, _, _) in FORMATS.items()))
+    for variant in VARIANTS))
+
+FEATURE_COLLECTION_SQL = """
+SELECT json_build_object(
+    'type', 'FeatureCollection',
+    'features', coalesce(json_agg(json_build_object(
+        'type', 'Feature',
+        'id', feature.id,
+        'geometry', feature.geometry::json,
+        'properties', json_build_object(
+            'image', CASE WHEN feature.image = '' THEN NULL
+                          ELSE media.url || feature.image END,
+            'image_variants', CASE WHEN feature.image_variants_ready
+                                   THEN {variants} END,
+            'image_width', feature.image_width,
+            'image_height', feature.image_height,
+            'image_size', feature.image_size,
+            'image_sha256', feature.image_sha256,
+            'image_color', feature.image_color,
+            'place_id', feature.place
+        )
+    )), '[]'::json)
+)::text
+FROM ({query}) AS feature
+CROSS JOIN (SELECT %s::text AS url) AS media
+"""
+
+
+def raw_feature(id, geometry, properties):
+    """Return a feature whose geometry is already GeoJSON text"""
+    return b''.join([
+        b'{"type":"Feature","id":', dumps(id),
+        b',"geometry":', geometry.encode() if geometry else b'null',
+        b',"properties":', dumps(properties), b'}',
+    ])
+
+
+def serialized_features(serializer, queryset, chunk_size=CHUNK_SIZE):
+    """Yield the features of queryset encoded one row at a time
+
+    Rows come from a server-side cursor so only chunk_size model
+    instances are held in memory at once.
+    """
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        yield dumps(serializer.to_representation(instance))
+
+
+def stream_feature_collection(features):
+    """Yield a FeatureCollection one encoded feature at a time"""
+    yield b'{"type":"FeatureCollection","features":['
+    separator = b''
+    for feature in features:
+        yield separator + feature
+        separator = b','
+    yield b']}'
+
+
+def feature_collection_from_db(queryset, media_url, precision):
+    """Return the points of queryset as FeatureCollection text built by
+    PostgreSQL, with the same features as the layer serializers.
+
+    media_url prefixes the image names and precision is the number of
+    decimals kept in the coordinates.
+    """
+    query, params = queryset.values(
+        'id', 'image', 'image_width', 'image_height', 'image_size',
+        'image_sha256', 'image_color', 'image_variants_ready',
+        place=F('place_id'),
+        geometry=AsGeoJSON('location', precision=precision),
+    ).query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(FEATURE_COLLECTION_SQL.format(
+            query=query, variants=VARIANTS_SQL), [*params, media_url])
+        return cursor.fetchone()[0]
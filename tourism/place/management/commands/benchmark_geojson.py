@@ -0,0 +1,92 @@
+"""
+django command to compare the GeoJSON paths of the place layer views
+"""
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.settings import api_settings
+
+from place.geojson import feature_collection_from_db
+from place.models import Places, TourismPlace
+from place.serializers import TourismSerializer
+
+
+class Command(BaseCommand):
+    "Django command to benchmark serializer and database built GeoJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Number of sample points to encode')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of timed runs of each path')
+
+    def handle(self, *args, **options):
+        """
+        Entrypoint for command
+        """
+        rows, repeat = options['rows'], options['repeat']
+        request = RequestFactory().get('/api/places/tourism/')
+        # the renderer the API responds with
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+
+        # Sample rows are rolled back once the benchmark is done
+        with transaction.atomic():
+            self.create_sample(rows)
+            queryset = TourismPlace.objects.all()
+
+            def serializer_path():
+                data = TourismSerializer(
+                    queryset, many=True, context={'request': request}).data
+                return renderer.render(data)
+
+            def database_path():
+                return feature_collection_from_db(
+                    queryset,
+                    request.build_absolute_uri(default_storage.base_url),
+                    settings.PLACE_GEOJSON_PRECISION)
+
+            for name, path in [('serializer', serializer_path),
+                               ('database', database_path)]:
+                best = min(self.time(path) for _ in range(repeat))
+                self.stdout.write(
+                    f'{name:>10}: {best * 1000:9.1f} ms  '
+                    f'{rows / best:12.0f} features/s')
+
+            transaction.set_rollback(True)
+
+    def create_sample(self, rows):
+        """Insert the sample rows without sending model signals
+
+        The signals would invalidate the shared tile cache and the token
+        cache, which the rollback of the sample does not undo.
+        """
+        User = get_user_model()
+        admin = User(email='benchmark-geojson@example.com',
+                     phone_number='+100000000000')
+        admin.set_unusable_password()
+        User.objects.bulk_create([admin])
+        [place] = Places.objects.bulk_create([Places(
+            name='benchmark', address='benchmark', type='TOURISM',
+            admin_id=admin)])
+        TourismPlace.objects.bulk_create(
+            TourismPlace(
+                place_id=place,
+                layer=TourismPlace.LAYER,
+                image=f'uploads/places/benchmark-{i}.jpg',
+                location=Point(random.uniform(44, 63),
+                               random.uniform(25, 40), srid=4326),
+            )
+            for i in range(rows)
+        )
+
+    def time(self, path):
+        start = time.perf_counter()
+        path()
+        return time.perf_counter() - start
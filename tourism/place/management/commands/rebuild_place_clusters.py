@@ -0,0 +1,30 @@
+"""
+django command to rebuild the precomputed place clusters
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from place import clusters
+from place.models import LAYERS
+
+
+class Command(BaseCommand):
+    "Django command to rebuild the precomputed place clusters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('layers', nargs='*',
+                            help='Layers to rebuild, all by default')
+
+    def handle(self, *args, **options):
+        """
+        Entrypoint for command
+        """
+        unknown = set(options['layers']) - set(LAYERS)
+        if unknown:
+            raise CommandError(f'Unknown layers: {", ".join(sorted(unknown))}')
+
+        for layer in options['layers'] or LAYERS:
+            clusters.rebuild(layer)
+            self.stdout.write(f'Rebuilt clusters of {layer}')
+
+        self.stdout.write(self.style.SUCCESS('Place clusters rebuilt!'))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 09:12
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('layer', models.CharField(max_length=13)),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('cell_x', models.IntegerField()),
+                ('cell_y', models.IntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('location', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='placecluster',
+            constraint=models.UniqueConstraint(fields=('layer', 'zoom', 'cell_x', 'cell_y'), name='unique_place_cluster_cell'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 4.2 on 2026-10-18 11:40
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import BtreeGistExtension
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import place.models
+
+
+LAYER_TABLES = [
+    ('RECREATIONAL', 'place_recreationalplace'),
+    ('SHOPPING', 'place_shoppingplace'),
+    ('TOURISM', 'place_tourismplace'),
+]
+
+COPY_TO_GEOPLACE = ' '.join(
+    f"INSERT INTO place_geoplace (location, image, place_id_id, layer) "
+    f"SELECT location, image, place_id_id, '{layer}' FROM {table};"
+    for layer, table in LAYER_TABLES
+)
+
+COPY_FROM_GEOPLACE = ' '.join(
+    f"INSERT INTO {table} (location, image, place_id_id) "
+    f"SELECT location, image, place_id_id FROM place_geoplace "
+    f"WHERE layer = '{layer}';"
+    for layer, table in LAYER_TABLES
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0002_placecluster'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.CreateModel(
+            name='GeoPlace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', django.contrib.gis.db.models.fields.PointField(spatial_index=False, srid=4326)),
+                ('image', models.ImageField(upload_to=place.models.places_image_file_path, validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'gif', 'png'])])),
+                ('layer', models.CharField(choices=[('RECREATIONAL', 'RECREATIONAL'), ('SHOPPING', 'SHOPPING'), ('TOURISM', 'TOURISM')], max_length=13)),
+                ('place_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='place.places')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GistIndex(fields=['layer', 'location'], name='place_geo_layer_location_gist')],
+            },
+        ),
+        migrations.RunSQL(COPY_TO_GEOPLACE, reverse_sql=COPY_FROM_GEOPLACE),
+        migrations.DeleteModel(
+            name='RecreationalPlace',
+        ),
+        migrations.DeleteModel(
+            name='ShoppingPlace',
+        ),
+        migrations.DeleteModel(
+            name='TourismPlace',
+        ),
+        migrations.CreateModel(
+            name='RecreationalPlace',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('place.geoplace',),
+        ),
+        migrations.CreateModel(
+            name='ShoppingPlace',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('place.geoplace',),
+        ),
+        migrations.CreateModel(
+            name='TourismPlace',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('place.geoplace',),
+        ),
+    ]
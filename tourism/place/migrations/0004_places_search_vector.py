@@ -0,0 +1,50 @@
+# Generated by Django 4.2 on 2026-10-18 16:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import BtreeGinExtension
+from django.db import migrations
+
+# Keep in sync with place.fulltext.SEARCH_CONFIG
+SEARCH_TRIGGER = """
+CREATE FUNCTION place_places_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.address, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER place_places_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, address, search_vector ON place_places
+FOR EACH ROW EXECUTE FUNCTION place_places_search_vector_update();
+
+UPDATE place_places SET search_vector = NULL;
+"""
+
+DROP_SEARCH_TRIGGER = """
+DROP TRIGGER place_places_search_vector_trigger ON place_places;
+DROP FUNCTION place_places_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0003_geoplace'),
+    ]
+
+    operations = [
+        BtreeGinExtension(),
+        migrations.AddField(
+            model_name='places',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(SEARCH_TRIGGER, reverse_sql=DROP_SEARCH_TRIGGER),
+        migrations.AddIndex(
+            model_name='places',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['type', 'search_vector'], name='place_type_search_gin'),
+        ),
+    ]
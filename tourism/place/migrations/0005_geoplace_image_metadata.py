@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0004_places_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geoplace',
+            name='image_color',
+            field=models.CharField(blank=True, default='', editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='geoplace',
+            name='image_height',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='geoplace',
+            name='image_sha256',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='geoplace',
+            name='image_size',
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='geoplace',
+            name='image_width',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+    ]
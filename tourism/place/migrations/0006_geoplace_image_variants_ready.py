@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0005_geoplace_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geoplace',
+            name='image_variants_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Fill the precomputed clusters from the points saved before they were kept
+# up to date, the same grid as place.clusters.rebuild
+
+from django.conf import settings
+from django.db import migrations
+
+
+# (layer key, GeoPlace.layer)
+LAYERS = [
+    ('recreational', 'RECREATIONAL'),
+    ('shopping', 'SHOPPING'),
+    ('tourism', 'TOURISM'),
+]
+
+# place.clusters.CELLS_PER_TILE when this migration was written
+CELLS_PER_TILE = 4
+
+REBUILD_CLUSTERS = 'DELETE FROM place_placecluster; ' + ' '.join(
+    f"INSERT INTO place_placecluster "
+    f"(layer, zoom, cell_x, cell_y, count, location) "
+    f"SELECT '{key}', grid.zoom, "
+    f"floor(ST_X(point.location) / grid.size), "
+    f"floor(ST_Y(point.location) / grid.size), "
+    f"count(*), ST_Centroid(ST_Collect(point.location)) "
+    f"FROM place_geoplace AS point "
+    f"CROSS JOIN (SELECT zoom, 360.0 / (2 ^ zoom) / {CELLS_PER_TILE} AS size "
+    f"FROM generate_series(0, {int(settings.PLACE_CLUSTER_PRECOMPUTED_ZOOM)}) "
+    f"AS zoom) AS grid "
+    f"WHERE point.layer = '{layer}' GROUP BY 2, 3, 4;"
+    for key, layer in LAYERS
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0006_geoplace_image_variants_ready'),
+    ]
+
+    operations = [
+        migrations.RunSQL(REBUILD_CLUSTERS, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -3,7 +3,10 @@ import os
 
 from django.conf import settings
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVectorField
 import uuid
+from core.models import ImageMetadata
 from django.core.validators import (
     FileExtensionValidator)
 
@@ -33,30 +36,99 @@ class Places(models.Model):
 
     admin_id = models.ForeignKey(
         settings.AUTH_USER_MODEL, default=0, on_delete=models.SET_DEFAULT)
+    # weighted name and address lexemes, kept up to date by a trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['type', 'search_vector'],
+                     name='place_type_search_gin'),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class RecreationalPlace(models.Model):
-    location = models.PointField()
-    image = models.ImageField(upload_to=places_image_file_path, validators=[
-                              FileExtensionValidator
-                              (['jpg', 'jpeg', 'gif', 'png',])])
-    place_id = models.ForeignKey('Places', on_delete=models.CASCADE)
+class GeoPlace(ImageMetadata):
+    """Point of a place on one of the map layers.
 
+    The layers share this table and its single GiST index on
+    (layer, location), so cross-layer queries need no UNION and
+    per-layer queries still only read their own layer.
+    """
+    LAYER = None
 
-class ShoppingPlace(models.Model):
-    location = models.PointField(unique=True)
+    location = models.PointField(spatial_index=False)
     image = models.ImageField(upload_to=places_image_file_path, validators=[
                               FileExtensionValidator
                               (['jpg', 'jpeg', 'gif', 'png',])])
     place_id = models.ForeignKey('Places', on_delete=models.CASCADE)
+    layer = models.CharField(max_length=13, choices=Places.TYPE_PLACES)
 
+    class Meta:
+        indexes = [
+            GistIndex(fields=['layer', 'location'],
+                      name='place_geo_layer_location_gist'),
+        ]
 
-class TourismPlace(models.Model):
-    location = models.PointField(unique=True)
-    image = models.ImageField(upload_to=places_image_file_path, validators=[
-                              FileExtensionValidator
-                              (['jpg', 'jpeg', 'gif', 'png',])])
-    place_id = models.ForeignKey('Places', on_delete=models.CASCADE)
+    def save(self, *args, **kwargs):
+        if self.LAYER:
+            self.layer = self.LAYER
+        super().save(*args, **kwargs)
+
+
+class LayerManager(models.Manager):
+    """Manager of the points of a single layer"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(layer=self.model.LAYER)
+
+
+class RecreationalPlace(GeoPlace):
+    LAYER = 'RECREATIONAL'
+    objects = LayerManager()
+
+    class Meta:
+        proxy = True
+
+
+class ShoppingPlace(GeoPlace):
+    LAYER = 'SHOPPING'
+    objects = LayerManager()
+
+    class Meta:
+        proxy = True
+
+
+class TourismPlace(GeoPlace):
+    LAYER = 'TOURISM'
+    objects = LayerManager()
+
+    class Meta:
+        proxy = True
+
+
+LAYERS = {
+    'shopping': ShoppingPlace,
+    'tourism': TourismPlace,
+    'recreational': RecreationalPlace,
+}
+
+LAYER_KEYS = {model.LAYER: layer for layer, model in LAYERS.items()}
+
+
+class PlaceCluster(models.Model):
+    """Precomputed grid cluster of a place layer at a coarse zoom level"""
+    layer = models.CharField(max_length=13)
+    zoom = models.PositiveSmallIntegerField()
+    cell_x = models.IntegerField()
+    cell_y = models.IntegerField()
+    count = models.PositiveIntegerField()
+    location = models.PointField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['layer', 'zoom', 'cell_x', 'cell_y'],
+                name='unique_place_cluster_cell'),
+        ]
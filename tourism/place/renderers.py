@@ -0,0 +1,16 @@
+"""Renderers for the place APIs"""
+
+from rest_framework.renderers import BaseRenderer
+
+
+class MVTRenderer(BaseRenderer):
+    """Pass through tiles already encoded as Mapbox vector tiles"""
+    media_type = 'application/vnd.mapbox-vector-tile'
+    format = 'mvt'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, (bytes, bytearray)):
+            return b''
+        return data
@@ -0,0 +1,82 @@
+"""Search across every place layer in a single query"""
+
+from django.core.files.storage import default_storage
+from django.db import connection
+
+from core.images import variant_urls
+from place.geojson import CHUNK_SIZE, raw_feature
+from place.models import GeoPlace, LAYER_KEYS, LAYERS, Places
+from place.sql import quote_column, quote_table
+
+SEARCH_SQL = """
+SELECT layer.{layer} AS layer,
+       layer.{pk} AS id,
+       ST_AsGeoJSON(layer.{location}, 6) AS geometry,
+       layer.{image} AS image,
+       layer.{variants_ready} AS variants_ready,
+       place.{place_pk} AS place_id,
+       place.{name} AS name,
+       place.{type} AS type
+FROM {table} AS layer
+JOIN {places} AS place ON place.{place_pk} = layer.{place_fk}
+WHERE {where}
+"""
+
+
+def search_sql(layers, bbox=None, point=None, distance=None):
+    """Return the query over the layers and its parameters
+
+    bbox is a polygon whose extent bounds the points, point and distance
+    (in degrees) a circle around which they must lie.
+    """
+    location = f'layer.{quote_column(GeoPlace, "location")}'
+    where = [f'layer.{quote_column(GeoPlace, "layer")} = ANY(%s)']
+    params = [[LAYERS[layer].LAYER for layer in layers]]
+    if bbox is not None:
+        where.append(f'{location} && ST_MakeEnvelope(%s, %s, %s, %s, 4326)')
+        params += list(bbox.extent)
+    if point is not None:
+        where.append(f'ST_DWithin({location}, '
+                     'ST_SetSRID(ST_MakePoint(%s, %s), 4326), %s)')
+        params += [point.x, point.y, distance]
+
+    sql = SEARCH_SQL.format(
+        table=quote_table(GeoPlace),
+        places=quote_table(Places),
+        pk=quote_column(GeoPlace, 'id'),
+        location=quote_column(GeoPlace, 'location'),
+        layer=quote_column(GeoPlace, 'layer'),
+        image=quote_column(GeoPlace, 'image'),
+        variants_ready=quote_column(GeoPlace, 'image_variants_ready'),
+        place_fk=quote_column(GeoPlace, 'place_id'),
+        place_pk=quote_column(Places, 'id'),
+        name=quote_column(Places, 'name'),
+        type=quote_column(Places, 'type'),
+        where=' AND '.join(where),
+    )
+    return sql, params
+
+
+def search_features(request, layers, **filters):
+    """Yield the encoded features of every layer matching the filters"""
+    sql, params = search_sql(layers, **filters)
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(CHUNK_SIZE)
+            if not rows:
+                break
+            for (layer, id, geometry, image, variants_ready,
+                 place_id, name, type) in rows:
+                layer = LAYER_KEYS[layer]
+                yield raw_feature(f'{layer}.{id}', geometry, {
+                    'layer': layer,
+                    'id': id,
+                    'image': request.build_absolute_uri(
+                        default_storage.url(image)) if image else None,
+                    'image_variants': variant_urls(image, request)
+                    if image and variants_ready else None,
+                    'place_id': place_id,
+                    'name': name,
+                    'type': type,
+                })
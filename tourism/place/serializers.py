@@ -1,38 +1,85 @@
+from rest_framework.fields import FloatField
 from rest_framework_gis import serializers
 
+from core.serializers import ImageVariantsField
+
 from .models import (
     Places,
     TourismPlace,
     ShoppingPlace,
-    RecreationalPlace)
+    RecreationalPlace,
+    PlaceCluster)
 
 
 class PlacesSerializer(serializers.ModelSerializer):
     class Meta:
         model = Places
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_field = 'id'
 
 
+class PlacesSearchSerializer(PlacesSerializer):
+    rank = FloatField(read_only=True)
+
+
+def nearest_serializer(serializer_class):
+    """Return serializer_class with the distance in meters to the point
+    the nearest places were searched from"""
+    class NearestSerializer(serializer_class):
+        distance = FloatField(source='distance.m', read_only=True)
+
+        class Meta(serializer_class.Meta):
+            fields = serializer_class.Meta.fields + ('distance',)
+
+    NearestSerializer.__name__ = NearestSerializer.__qualname__ = \
+        serializer_class.__name__.replace('Serializer', 'NearestSerializer')
+    return NearestSerializer
+
+
 class TourismSerializer(serializers.GeoFeatureModelSerializer):
+    image_variants = ImageVariantsField(source='image')
+
     class Meta:
         model = TourismPlace
-        fields = ('id', 'image', 'place_id')
+        fields = ('id', 'image', 'image_variants', 'image_width',
+                  'image_height', 'image_size', 'image_sha256', 'image_color',
+                  'place_id')
         geo_field = 'location'
         read_only_field = 'id'
 
 
 class ShoppingSerializer(serializers.GeoFeatureModelSerializer):
+    image_variants = ImageVariantsField(source='image')
+
     class Meta:
         model = ShoppingPlace
-        fields = ('id', 'image', 'place_id')
+        fields = ('id', 'image', 'image_variants', 'image_width',
+                  'image_height', 'image_size', 'image_sha256', 'image_color',
+                  'place_id')
         geo_field = 'location'
         read_only_field = 'id'
 
 
 class RecreationalSerializer(serializers.GeoFeatureModelSerializer):
+    image_variants = ImageVariantsField(source='image')
+
     class Meta:
         model = RecreationalPlace
-        fields = ('id', 'image', 'place_id')
+        fields = ('id', 'image', 'image_variants', 'image_width',
+                  'image_height', 'image_size', 'image_sha256', 'image_color',
+                  'place_id')
         geo_field = 'location'
         read_only_field = 'id'
+
+
+TourismNearestSerializer = nearest_serializer(TourismSerializer)
+ShoppingNearestSerializer = nearest_serializer(ShoppingSerializer)
+RecreationalNearestSerializer = nearest_serializer(RecreationalSerializer)
+
+
+class PlaceClusterSerializer(serializers.GeoFeatureModelSerializer):
+    class Meta:
+        model = PlaceCluster
+        fields = ('count',)
+        geo_field = 'location'
+        id_field = False
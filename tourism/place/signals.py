@@ -0,0 +1,49 @@
+"""Signal handlers for the place app"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import images
+from place import clusters, tiles
+from place.models import GeoPlace, LAYER_KEYS, LAYERS, Places
+
+
+@receiver([post_save, post_delete], sender=Places)
+def invalidate_all_tiles(sender, **kwargs):
+    """Place names and types are baked into every layer's tiles"""
+    for layer in LAYERS:
+        tiles.invalidate_layer(layer)
+
+
+def remember_location(sender, instance, raw=False, **kwargs):
+    """Keep the stored location so a moved point leaves its old cluster"""
+    instance._previous_location = None
+    if instance.pk and not raw:
+        instance._previous_location = GeoPlace.objects.filter(
+            pk=instance.pk).values_list('location', flat=True).first()
+
+
+def layer_saved(sender, instance, created=False, raw=False, **kwargs):
+    layer = LAYER_KEYS[instance.layer]
+    tiles.invalidate_layer(layer)
+    if raw:
+        return
+    if created:
+        clusters.update(layer, added=[instance.location])
+        return
+    previous = getattr(instance, '_previous_location', None)
+    if previous != instance.location:
+        clusters.update(layer, added=[instance.location], removed=[previous])
+
+
+def layer_deleted(sender, instance, **kwargs):
+    layer = LAYER_KEYS[instance.layer]
+    tiles.invalidate_layer(layer)
+    clusters.update(layer, removed=[instance.location])
+
+
+for model in [GeoPlace, *LAYERS.values()]:
+    pre_save.connect(remember_location, sender=model)
+    post_save.connect(layer_saved, sender=model)
+    post_delete.connect(layer_deleted, sender=model)
+    images.track_uploads(model)
@@ -0,0 +1,13 @@
+"""Helpers for the raw PostGIS queries of the place app"""
+
+from django.db import connection
+
+
+def quote_table(model):
+    """Return the quoted table name of a model"""
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def quote_column(model, field_name):
+    """Return the quoted column name of a model field"""
+    return connection.ops.quote_name(model._meta.get_field(field_name).column)
@@ -0,0 +1,430 @@
+"""Tests for the place APIs"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from place import clusters
+from place.models import (
+    GeoPlace,
+    Places,
+    PlaceCluster,
+    ShoppingPlace,
+    TourismPlace,
+)
+
+TOURISM_URL = reverse('place:tourism-list')
+TOURISM_NEAREST_URL = reverse('place:tourism-nearest')
+SEARCH_URL = reverse('place:search')
+PLACES_SEARCH_URL = reverse('place:places-search')
+
+
+def tile_url(layer, z, x, y):
+    """Create and return a vector tile url"""
+    return reverse('place:tile', args=[layer, z, x, y])
+
+
+def create_place(admin, **params):
+    """Create and return a sample place"""
+    defaults = {
+        'name': 'test place',
+        'address': 'test address',
+        'type': 'TOURISM',
+    }
+    defaults.update(params)
+
+    return Places.objects.create(admin_id=admin, **defaults)
+
+
+def create_tourism_place(place, lon, lat):
+    """Create and return a tourism point for the place"""
+    return TourismPlace.objects.create(
+        place_id=place,
+        location=Point(lon, lat, srid=4326),
+        image='uploads/places/test.jpg',
+    )
+
+
+class PublicGeoPlaceApiTests(TestCase):
+    """Test the place layer APIs"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.\
+            create_superuser(  # type: ignore
+                email='admin@example.com',
+                password='testpass123',
+            )
+        place = create_place(self.admin)
+        self.tehran = create_tourism_place(place, 51.3890, 35.6892)
+        self.shiraz = create_tourism_place(place, 52.5836, 29.5918)
+
+    def _feature_ids(self, response):
+        return [f['id'] for f in response.data['features']]
+
+    def test_list_without_filter(self):
+        """Test listing every point when no filter is given"""
+        response = self.client.get(TOURISM_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(self._feature_ids(response),
+                              [self.tehran.id, self.shiraz.id])
+
+    def test_list_paginated(self):
+        """Test a page of the layer is still a FeatureCollection"""
+        response = self.client.get(TOURISM_URL, {'page_size': 1})
+
+        self.assertEqual(response.data['type'], 'FeatureCollection')
+        self.assertEqual(self._feature_ids(response), [self.shiraz.id])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_list_streamed(self):
+        """Test the streamed layer holds every filtered feature"""
+        response = self.client.get(TOURISM_URL, {
+            'stream': 'true',
+            'in_bbox': '51.0,29.0,53.0,36.0',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data['type'], 'FeatureCollection')
+        self.assertCountEqual([f['id'] for f in data['features']],
+                              [self.tehran.id, self.shiraz.id])
+        self.assertTrue(data['features'][0]['properties']['image']
+                        .startswith('http://testserver/'))
+
+    def test_list_rendered_in_db(self):
+        """Test the database built layer matches the serializer output"""
+        expected = self.client.get(TOURISM_URL).data['features']
+
+        response = self.client.get(TOURISM_URL, {'render': 'db'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        features = json.loads(response.content)['features']
+        self.assertCountEqual(
+            [(f['id'], f['properties']) for f in features],
+            [(f['id'], dict(f['properties'])) for f in expected])
+        self.assertCountEqual(
+            [f['geometry']['coordinates'] for f in features],
+            [list(f['geometry']['coordinates']) for f in expected])
+
+    def test_filter_in_bbox(self):
+        """Test only the points inside the bbox are returned"""
+        response = self.client.get(TOURISM_URL,
+                                   {'in_bbox': '51.0,35.0,52.0,36.0'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._feature_ids(response), [self.tehran.id])
+
+    def test_filter_distance_to_point(self):
+        """Test only the points within the radius are returned"""
+        response = self.client.get(TOURISM_URL, {
+            'point': '52.58,29.59',
+            'dist': 5000,
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._feature_ids(response), [self.shiraz.id])
+
+    def test_nearest(self):
+        """Test the closest points are returned first with distances"""
+        response = self.client.get(TOURISM_NEAREST_URL, {
+            'point': '51.40,35.70',
+            'limit': 1,
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        features = response.data['features']
+        self.assertEqual([f['id'] for f in features], [self.tehran.id])
+        self.assertLess(features[0]['properties']['distance'], 2000)
+
+    def test_nearest_ordered_by_distance(self):
+        """Test every point is returned in distance order"""
+        response = self.client.get(TOURISM_NEAREST_URL,
+                                   {'point': '52.50,29.50'})
+
+        self.assertEqual(self._feature_ids(response),
+                         [self.shiraz.id, self.tehran.id])
+
+    def test_nearest_requires_point(self):
+        """Test the nearest places need a point"""
+        response = self.client.get(TOURISM_NEAREST_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_layers_share_one_table(self):
+        """Test every layer only sees its own points of the geo table"""
+        ShoppingPlace.objects.create(
+            place_id=self.tehran.place_id,
+            location=Point(51.4200, 35.6700, srid=4326),
+            image='uploads/places/test.jpg',
+        )
+
+        self.assertEqual(GeoPlace.objects.count(), 3)
+        self.assertEqual(TourismPlace.objects.count(), 2)
+        self.assertEqual(ShoppingPlace.objects.get().layer, 'SHOPPING')
+
+        response = self.client.get(TOURISM_URL)
+        self.assertCountEqual(self._feature_ids(response),
+                              [self.tehran.id, self.shiraz.id])
+
+    def test_invalid_bbox_error(self):
+        """Test a malformed bbox returns an error"""
+        response = self.client.get(TOURISM_URL, {'in_bbox': 'not,a,bbox'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PlaceTileApiTests(TestCase):
+    """Test the vector tile API"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.\
+            create_superuser(  # type: ignore
+                email='admin@example.com',
+                password='testpass123',
+            )
+        self.place = create_place(self.admin)
+
+    def test_get_tile(self):
+        """Test a tile is rendered as a protobuf"""
+        create_tourism_place(self.place, 51.3890, 35.6892)
+
+        response = self.client.get(tile_url('tourism', 0, 0, 0))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'],
+                         'application/vnd.mapbox-vector-tile')
+        self.assertTrue(response.content)
+
+    def test_empty_tile(self):
+        """Test a tile without points is empty"""
+        response = self.client.get(tile_url('shopping', 0, 0, 0))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'')
+
+    def test_tile_invalidated_on_change(self):
+        """Test a cached tile is rebuilt once the layer changes"""
+        url = tile_url('tourism', 0, 0, 0)
+        self.assertEqual(self.client.get(url).content, b'')
+
+        create_tourism_place(self.place, 51.3890, 35.6892)
+
+        self.assertTrue(self.client.get(url).content)
+
+    def test_unknown_layer_not_found(self):
+        """Test an unknown layer returns 404"""
+        response = self.client.get(tile_url('hotels', 0, 0, 0))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_out_of_range_tile_not_found(self):
+        """Test a tile outside the zoom level grid returns 404"""
+        response = self.client.get(tile_url('tourism', 1, 2, 0))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PlaceClusterApiTests(TestCase):
+    """Test the clustered mode of the place layer APIs"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.\
+            create_superuser(  # type: ignore
+                email='admin@example.com',
+                password='testpass123',
+            )
+        self.place = create_place(self.admin)
+        create_tourism_place(self.place, 51.3890, 35.6892)
+        create_tourism_place(self.place, 51.4000, 35.7000)
+        create_tourism_place(self.place, 52.5836, 29.5918)
+
+    def _counts(self, response):
+        return sorted(f['properties']['count']
+                      for f in response.data['features'])
+
+    def test_precomputed_clusters(self):
+        """Test coarse zoom levels are served from the cluster table"""
+        response = self.client.get(TOURISM_URL, {'cluster': 0})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._counts(response), [3])
+        self.assertEqual(
+            PlaceCluster.objects.filter(layer='tourism', zoom=0).count(), 1)
+
+    def test_clusters_on_the_fly(self):
+        """Test fine zoom levels are grouped per request"""
+        response = self.client.get(TOURISM_URL, {'cluster': 10})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._counts(response), [1, 2])
+
+    @override_settings(PLACE_CLUSTER_PRECOMPUTED_ZOOM=10)
+    def test_precomputed_matches_on_the_fly(self):
+        """Test both cluster modes group the points the same way"""
+        TourismPlace.objects.all().delete()
+        create_tourism_place(self.place, 51.3890, 35.6892)
+        create_tourism_place(self.place, 51.4000, 35.7000)
+        create_tourism_place(self.place, 52.5836, 29.5918)
+
+        response = self.client.get(TOURISM_URL, {'cluster': 10})
+
+        self.assertEqual(self._counts(response), [1, 2])
+
+    def test_cluster_refreshed_on_move_and_delete(self):
+        """Test moving and deleting a point updates its clusters"""
+        point = TourismPlace.objects.get(location=Point(52.5836, 29.5918))
+        point.location = Point(51.3900, 35.6900)
+        point.save()
+
+        response = self.client.get(TOURISM_URL, {'cluster': 8})
+        self.assertEqual(self._counts(response), [3])
+
+        point.delete()
+
+        response = self.client.get(TOURISM_URL, {'cluster': 8})
+        self.assertEqual(self._counts(response), [2])
+
+    def test_cluster_updates_match_rebuild(self):
+        """Test the incremental counts and centroids match a rebuild"""
+        point = TourismPlace.objects.get(location=Point(52.5836, 29.5918))
+        point.location = Point(52.5900, 29.6000)
+        point.save()
+        TourismPlace.objects.get(location=Point(51.4000, 35.7000)).delete()
+
+        def rows():
+            return sorted(
+                (c.zoom, c.cell_x, c.cell_y, c.count,
+                 round(c.location.x, 6), round(c.location.y, 6))
+                for c in PlaceCluster.objects.filter(layer='tourism'))
+
+        updated = rows()
+        clusters.rebuild('tourism')
+
+        self.assertEqual(updated, rows())
+
+    def test_invalid_zoom_error(self):
+        """Test an invalid zoom level returns an error"""
+        response = self.client.get(TOURISM_URL, {'cluster': 'far'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PlaceSearchApiTests(TestCase):
+    """Test the multi-layer search API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.\
+            create_superuser(  # type: ignore
+                email='admin@example.com',
+                password='testpass123',
+            )
+        tower = create_place(self.admin, name='tower')
+        bazaar = create_place(self.admin, name='bazaar', type='SHOPPING')
+        self.tower = create_tourism_place(tower, 51.3890, 35.6892)
+        self.bazaar = ShoppingPlace.objects.create(
+            place_id=bazaar,
+            location=Point(51.4200, 35.6700, srid=4326),
+            image='uploads/places/bazaar.jpg',
+        )
+        create_tourism_place(tower, 52.5836, 29.5918)
+
+    def _search(self, params):
+        response = self.client.get(SEARCH_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_search_all_layers(self):
+        """Test features of every layer come back in one collection"""
+        data = self._search({'in_bbox': '51.0,35.0,52.0,36.0'})
+
+        self.assertEqual(data['type'], 'FeatureCollection')
+        self.assertCountEqual(
+            [(f['properties']['layer'], f['properties']['name'])
+             for f in data['features']],
+            [('tourism', 'tower'), ('shopping', 'bazaar')])
+
+    def test_search_distance_to_point(self):
+        """Test the search is limited to the radius around the point"""
+        data = self._search({'point': '51.42,35.67', 'dist': 500})
+
+        self.assertEqual([f['id'] for f in data['features']],
+                         [f'shopping.{self.bazaar.id}'])
+
+    def test_search_layers(self):
+        """Test the search can be limited to some layers"""
+        data = self._search({'layers': 'shopping'})
+
+        self.assertEqual([f['properties']['layer'] for f in data['features']],
+                         ['shopping'])
+
+    def test_search_unknown_layer_error(self):
+        """Test an unknown layer returns an error"""
+        response = self.client.get(SEARCH_URL, {'layers': 'hotels'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PlacesFullTextSearchApiTests(TestCase):
+    """Test the full-text search of places"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.\
+            create_superuser(  # type: ignore
+                email='admin@example.com',
+                password='testpass123',
+            )
+        self.museum = create_place(
+            self.admin, name='National Museum', address='Imam Khomeini street')
+        self.bazaar = create_place(
+            self.admin, name='Grand Bazaar', address='Near the museums',
+            type='SHOPPING')
+        create_place(self.admin, name='Milad Tower', address='Hemmat highway')
+
+    def _names(self, response):
+        return [place['name'] for place in response.data]
+
+    def test_search_stems_and_ranks(self):
+        """Test stemmed matches are returned, name matches first"""
+        response = self.client.get(PLACES_SEARCH_URL, {'q': 'museum'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._names(response),
+                         ['National Museum', 'Grand Bazaar'])
+        self.assertGreater(response.data[0]['rank'], response.data[1]['rank'])
+        self.assertNotIn('search_vector', response.data[0])
+
+    def test_search_by_type(self):
+        """Test the type filter applies to the search"""
+        response = self.client.get(PLACES_SEARCH_URL,
+                                   {'q': 'museum', 'type': 'SHOPPING'})
+
+        self.assertEqual(self._names(response), ['Grand Bazaar'])
+
+    def test_search_sees_updates(self):
+        """Test the search vector follows changes of the name"""
+        self.museum.name = 'Carpet Museum'
+        self.museum.save()
+
+        response = self.client.get(PLACES_SEARCH_URL, {'q': 'carpet'})
+
+        self.assertEqual(self._names(response), ['Carpet Museum'])
+
+    def test_search_requires_query(self):
+        """Test searching without q is rejected"""
+        response = self.client.get(PLACES_SEARCH_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,90 @@
+"""Mapbox vector tiles for the place layers"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .models import LAYERS, Places
+from .sql import quote_column, quote_table
+
+MAX_ZOOM = 22
+
+TILE_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS geom
+),
+features AS (
+    SELECT ST_AsMVTGeom(ST_Transform(layer.{location}, 3857), bounds.geom)
+               AS geom,
+           layer.{pk} AS id,
+           place.{place_pk} AS place_id,
+           place.{name} AS name,
+           place.{type} AS type
+    FROM {table} AS layer
+    JOIN {places} AS place ON place.{place_pk} = layer.{place_fk}
+    CROSS JOIN bounds
+    WHERE layer.{layer} = %(layer_type)s
+      AND layer.{location} && ST_Transform(bounds.geom, 4326)
+)
+SELECT ST_AsMVT(features.*, %(layer)s, 4096, 'geom', 'id') FROM features
+"""
+
+
+def is_valid_tile(z, x, y):
+    """Return True if z/x/y addresses an existing tile"""
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def _tile_sql(model):
+    return TILE_SQL.format(
+        table=quote_table(model),
+        places=quote_table(Places),
+        pk=quote_column(model, 'id'),
+        location=quote_column(model, 'location'),
+        layer=quote_column(model, 'layer'),
+        place_fk=quote_column(model, 'place_id'),
+        place_pk=quote_column(Places, 'id'),
+        name=quote_column(Places, 'name'),
+        type=quote_column(Places, 'type'),
+    )
+
+
+def _version_key(layer):
+    return f'place-tile-version:{layer}'
+
+
+def layer_version(layer):
+    """Return the current cache version of a layer"""
+    return cache.get_or_set(_version_key(layer), 1, timeout=None)
+
+
+def invalidate_layer(layer):
+    """Make every cached tile of the layer stale"""
+    try:
+        cache.incr(_version_key(layer))
+    except ValueError:
+        cache.set(_version_key(layer), 1, timeout=None)
+
+
+def render_tile(layer, z, x, y):
+    """Build the tile in PostGIS and return the protobuf bytes"""
+    model = LAYERS[layer]
+    with connection.cursor() as cursor:
+        cursor.execute(_tile_sql(model), {
+            'z': z, 'x': x, 'y': y,
+            'layer': layer, 'layer_type': model.LAYER,
+        })
+        row = cursor.fetchone()
+
+    return bytes(row[0]) if row and row[0] is not None else b''
+
+
+def get_tile(layer, z, x, y):
+    """Return the tile from cache, rendering it on a miss"""
+    key = f'place-tile:{layer}:{layer_version(layer)}:{z}/{x}/{y}'
+    tile = cache.get(key)
+    if tile is None:
+        tile = render_tile(layer, z, x, y)
+        cache.set(key, tile, timeout=settings.PLACE_TILE_CACHE_TIMEOUT)
+
+    return tile
@@ -12,6 +12,9 @@ app_name = 'place'
 
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router.urls)),
+    path('search/', views.PlaceSearchView.as_view(), name='search'),
+    path('tiles/<str:layer>/<int:z>/<int:x>/<int:y>.mvt',
+         views.PlaceTileView.as_view(), name='tile'),
 
 ]
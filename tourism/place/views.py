@@ -1,16 +1,37 @@
-
-
 # from rest_framework.generics import ListAPIView
+from django.contrib.gis.db.models.functions import Distance, GeometryDistance
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import viewsets
-# from rest_framework_gis import filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_gis import filters
+from core.pagination import GeoJsonCursorPagination, get_limit
+from place import clusters, fulltext, search, tiles
+from place.geojson import (
+    feature_collection_from_db,
+    serialized_features,
+    stream_feature_collection,
+)
+from .renderers import MVTRenderer
 from .serializers import (
     PlacesSerializer,
+    PlacesSearchSerializer,
+    PlaceClusterSerializer,
     RecreationalSerializer,
+    RecreationalNearestSerializer,
     TourismSerializer,
+    TourismNearestSerializer,
     ShoppingSerializer,
+    ShoppingNearestSerializer,
 )
 from .models import (
+    LAYERS,
     Places,
+    PlaceCluster,
     RecreationalPlace,
     TourismPlace,
     ShoppingPlace
@@ -18,26 +39,224 @@ from .models import (
 
 
 class PlacesApiView(viewsets.ReadOnlyModelViewSet):
+    """Places and their full-text search.
+
+    ``search/?q=text&type=TOURISM&limit=n`` returns the n places whose
+    name or address best match ``q``, stemmed in English, with their
+    ``rank``. The optional ``type`` is read from the same GIN index.
+    """
     queryset = Places.objects.all()
     serializer_class = PlacesSerializer
+    search_limit = 20
+    search_max_limit = 100
+
+    @action(detail=False)
+    def search(self, request):
+        """Return the places matching ?q= best ranked first"""
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            raise ParseError('q is required')
+
+        place_type = request.query_params.get('type')
+        if place_type is not None \
+                and place_type not in dict(Places.TYPE_PLACES):
+            raise ParseError(f'Unknown type: {place_type}')
+
+        limit = get_limit(request, self.search_limit, self.search_max_limit)
+        queryset = fulltext.search_places(
+            self.get_queryset(), text, place_type)[:limit]
+
+        serializer = PlacesSearchSerializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+class GeoPlaceApiView(viewsets.ReadOnlyModelViewSet):
+    """Base view for the place layers.
+
+    ``?in_bbox=min_lon,min_lat,max_lon,max_lat`` keeps the points inside the
+    viewport and ``?point=lon,lat&dist=meters`` the points within a radius.
+    Both compile to ``&&`` / ``ST_DWithin`` on ``location`` so PostGIS can
+    answer them from the GiST index of the point field.
+
+    ``?cluster=<zoom>`` returns one feature per grid cluster instead of
+    the points, with the number of points in its ``count`` property.
+
+    ``?stream=true`` skips pagination and streams the whole filtered
+    layer, encoding features as rows are read from the database.
+    ``?render=db`` also returns the whole filtered layer, but has
+    PostgreSQL build the FeatureCollection so no model instance or
+    geometry object is created in Python.
+
+    ``nearest/?point=lon,lat&limit=n`` returns the n closest points,
+    ordered by the index-assisted ``<->`` operator so only n rows are
+    read whatever the size of the table.
+    """
+    layer = None
+    nearest_serializer_class = None
+    nearest_limit = 10
+    nearest_max_limit = 100
+    bbox_filter_field = 'location'
+    bbox_filter_include_overlapping = True
+    distance_filter_field = 'location'
+    distance_filter_convert_meters = True
+    filter_backends = (filters.InBBOXFilter, filters.DistanceToPointFilter)
+    pagination_class = GeoJsonCursorPagination
+
+    def get_serializer_class(self):
+        """Return the serializer class for request"""
+        if self.action == 'nearest':
+            return self.nearest_serializer_class
+
+        return self.serializer_class
+
+    def get_nearest_limit(self):
+        """Return the number of places requested with ?limit="""
+        return get_limit(self.request, self.nearest_limit,
+                         self.nearest_max_limit)
+
+    def get_cluster_zoom(self):
+        """Return the zoom level requested with ?cluster=, if any"""
+        zoom = self.request.query_params.get('cluster')
+        if zoom is None:
+            return None
+
+        try:
+            zoom = int(zoom)
+        except ValueError:
+            zoom = -1
+        if not 0 <= zoom <= tiles.MAX_ZOOM:
+            raise ParseError(
+                f'cluster must be a zoom level from 0 to {tiles.MAX_ZOOM}')
+
+        return zoom
+
+    def stream(self):
+        """Return the filtered layer as a streamed FeatureCollection"""
+        queryset = self.filter_queryset(self.get_queryset())
+        features = serialized_features(self.get_serializer(), queryset)
+
+        return StreamingHttpResponse(stream_feature_collection(features),
+                                     content_type='application/json')
 
+    def render_in_db(self):
+        """Return the filtered layer as FeatureCollection built by the db"""
+        queryset = self.filter_queryset(self.get_queryset())
+        media_url = self.request.build_absolute_uri(default_storage.base_url)
+        content = feature_collection_from_db(
+            queryset, media_url, settings.PLACE_GEOJSON_PRECISION)
 
-class ShoppingApiView(viewsets.ReadOnlyModelViewSet):
+        return HttpResponse(content, content_type='application/json')
+
+    def list(self, request, *args, **kwargs):
+        zoom = self.get_cluster_zoom()
+        if zoom is None and request.query_params.get('stream') == 'true':
+            return self.stream()
+        if zoom is None and request.query_params.get('render') == 'db':
+            return self.render_in_db()
+        if zoom is None:
+            return super().list(request, *args, **kwargs)
+
+        if clusters.is_precomputed(zoom):
+            queryset = self.filter_queryset(
+                PlaceCluster.objects.filter(layer=self.layer, zoom=zoom))
+        else:
+            queryset = clusters.cluster_queryset(
+                self.filter_queryset(self.get_queryset()), zoom)
+
+        serializer = PlaceClusterSerializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False)
+    def nearest(self, request):
+        """Return the places closest to ?point=lon,lat"""
+        point = filters.DistanceToPointFilter().get_filter_point(
+            request, srid=4326)
+        if point is None:
+            raise ParseError('point is required')
+
+        limit = self.get_nearest_limit()
+        queryset = self.get_queryset()\
+            .annotate(distance=Distance('location', point))\
+            .order_by(GeometryDistance('location', point))[:limit]
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+class ShoppingApiView(GeoPlaceApiView):
+    layer = 'shopping'
     serializer_class = ShoppingSerializer
+    nearest_serializer_class = ShoppingNearestSerializer
     queryset = ShoppingPlace.objects.all()
-    # bbox_filter_field = 'location'
-    # filter_backends = (filters.InBBOXFilter,)
 
 
-class TourismApiView(viewsets.ReadOnlyModelViewSet):
+class TourismApiView(GeoPlaceApiView):
+    layer = 'tourism'
     serializer_class = TourismSerializer
+    nearest_serializer_class = TourismNearestSerializer
     queryset = TourismPlace.objects.all()
-    # bbox_filter_field = 'location'
-    # filter_backends = (filters.InBBOXFilter,)
 
 
-class RecreationalApiView(viewsets.ReadOnlyModelViewSet):
+class RecreationalApiView(GeoPlaceApiView):
+    layer = 'recreational'
     serializer_class = RecreationalSerializer
+    nearest_serializer_class = RecreationalNearestSerializer
     queryset = RecreationalPlace.objects.all()
-    # bbox_filter_field = 'location'
-    # filter_backends = (filters.InBBOXFilter,)
+
+
+class PlaceTileView(APIView):
+    """Serve a place layer as a Mapbox vector tile.
+
+    Tiles are encoded by PostGIS (``ST_AsMVT``) and cached per layer and
+    z/x/y until a row of the layer changes.
+    """
+    renderer_classes = [MVTRenderer]
+
+    def get(self, request, layer, z, x, y):
+        if layer not in LAYERS or not tiles.is_valid_tile(z, x, y):
+            raise NotFound()
+
+        return Response(tiles.get_tile(layer, z, x, y))
+
+
+class PlaceSearchView(APIView):
+    """Search every place layer at once.
+
+    Takes the ``in_bbox``, ``point`` and ``dist`` filters of the layer
+    views plus ``layers=shopping,tourism`` to restrict the layers. All
+    layers are read with one query on the shared geo table joined to
+    ``Places`` and the FeatureCollection is streamed as rows arrive, each
+    feature tagged with its ``layer``.
+    """
+
+    def get_layers(self):
+        """Return the layers requested with ?layers="""
+        layers = self.request.query_params.get('layers')
+        if not layers:
+            return list(LAYERS)
+
+        layers = layers.split(',')
+        unknown = set(layers) - set(LAYERS)
+        if unknown:
+            raise ParseError(f'Unknown layers: {", ".join(sorted(unknown))}')
+
+        return layers
+
+    def get(self, request):
+        bbox = filters.InBBOXFilter().get_filter_bbox(request)
+        distance_filter = filters.DistanceToPointFilter()
+        point = distance_filter.get_filter_point(request)
+        distance = None
+        if point is not None:
+            try:
+                distance = float(request.query_params.get('dist', 1000))
+            except ValueError:
+                raise ParseError('Invalid distance string supplied for '
+                                 'parameter dist')
+            distance = distance_filter.dist_to_deg(distance, point.y)
+
+        features = search.search_features(
+            request, self.get_layers(),
+            bbox=bbox, point=point, distance=distance)
+        return StreamingHttpResponse(stream_feature_collection(features),
+                                     content_type='application/json')
@@ -0,0 +1,65 @@
+"""Filters for the reservation APIs"""
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from django_filters import rest_framework as django_filters
+from rest_framework import filters
+
+from core.models import HotelAndResidence
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """Fuzzy ?search= on the view's search_fields, best matches first
+
+    Rows match when a word of one of the fields is similar to the term
+    (pg_trgm ``%>``), which the trigram GIN indexes of the fields answer
+    without scanning the table. The best similarity is annotated as
+    ``similarity`` and orders the results, ties by descending id.
+    """
+    search_ordering = ('-similarity', '-id')
+
+    def get_search_term(self, request):
+        """Return the ?search= term, '' when not searching"""
+        return request.query_params.get(self.search_param, '').strip()
+
+    def is_searching(self, request, view):
+        """Return True if the request searches the view"""
+        return bool(self.get_search_fields(view, request)
+                    and self.get_search_term(request))
+
+    def filter_queryset(self, request, queryset, view):
+        if not self.is_searching(request, view):
+            return queryset
+
+        search_fields = self.get_search_fields(view, request)
+        term = self.get_search_term(request)
+        condition = Q()
+        for field in search_fields:
+            condition |= Q(**{f'{field}__trigram_word_similar': term})
+        similarities = [TrigramWordSimilarity(term, field)
+                        for field in search_fields]
+        similarity = similarities[0] if len(similarities) == 1 \
+            else Greatest(*similarities)
+
+        return queryset.filter(condition).annotate(similarity=similarity)\
+            .order_by(*self.search_ordering)
+
+
+class HotelAndResidenceFilter(django_filters.FilterSet):
+    """Filter hotels by type, stars and a cost per night range
+
+    The filters map onto the (type_hotel, star, cost) index.
+    """
+    cost_min = django_filters.NumberFilter(field_name='cost',
+                                           lookup_expr='gte')
+    cost_max = django_filters.NumberFilter(field_name='cost',
+                                           lookup_expr='lte')
+
+    class Meta:
+        model = HotelAndResidence
+        fields = {
+            'name': ['exact'],
+            'type_hotel': ['exact'],
+            'star': ['exact', 'gte'],
+        }
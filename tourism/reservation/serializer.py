@@ -1,6 +1,10 @@
 """serializer for reservation"""
 
 
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Value
+from django.utils.translation import gettext_lazy as _
+from psycopg2.extras import DateRange
 from rest_framework import serializers
 
 
@@ -9,7 +13,9 @@ from core.models import (
     HotelAndResidence,
     TravelAgency,
     TouristTour,
+    normalized,
 )
+from reservation import services
 
 
 class ReservationSerializer(serializers.ModelSerializer):
@@ -23,13 +29,160 @@ class ReservationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class HotelAndResidenceSerializer(serializers.ModelSerializer):
+HOTEL_STAY_CONSTRAINT = 'exclude_overlapping_hotel_stays'
+STAY_CONFLICT = _('The hotel is already booked for these dates.')
+
+
+class StayField(serializers.Field):
+    """Stay dates as {"check_in": ..., "check_out": ...}
+
+    The check-out day is excluded, so a stay can start the day another
+    one ends.
+    """
+    default_error_messages = {
+        'invalid': _('Expected an object with check_in and check_out.'),
+        'order': _('check_out must be after check_in.'),
+    }
+
+    def to_representation(self, value):
+        date_field = serializers.DateField()
+        return {
+            'check_in': date_field.to_representation(value.lower),
+            'check_out': date_field.to_representation(value.upper),
+        }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, dict):
+            self.fail('invalid')
+
+        date_field = serializers.DateField()
+        check_in = date_field.run_validation(data.get('check_in'))
+        check_out = date_field.run_validation(data.get('check_out'))
+        if check_out <= check_in:
+            self.fail('order')
+
+        return DateRange(check_in, check_out)
+
+
+class StayConflictMixin:
+    """Report stays refused by the hotel exclusion constraint as errors
+
+    Overlaps are only checked by the database, so two requests booking
+    the same hotel at the same time cannot both succeed.
+    """
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            diag = getattr(error.__cause__, 'diag', None)
+            if getattr(diag, 'constraint_name', None) \
+                    != HOTEL_STAY_CONSTRAINT:
+                raise
+            raise serializers.ValidationError(self.stay_conflict_errors())
+
+    def stay_conflict_errors(self):
+        """Return the errors of a stay refused by the database"""
+        return {'stay': [STAY_CONFLICT]}
+
+
+class ReservationItemListSerializer(serializers.ListSerializer):
+    """Create a batch of items of the user's reservation at once"""
+
+    def create(self, validated_data):
+        for data in validated_data:
+            data.pop('reservation', None)
+        return services.create_items(
+            self.child.Meta.model,  # type: ignore
+            self.context['request'].user,
+            self.child.reservation_type,  # type: ignore
+            validated_data,
+        )
+
+
+class ReservationItemSerializer(serializers.ModelSerializer):
+    """Base serializer of the items attached to the user's reservation"""
+    reservation_type = None
+
+    def create(self, validated_data):
+        validated_data.pop('reservation', None)
+        return services.create_item(
+            self.Meta.model,  # type: ignore
+            self.context['request'].user,
+            self.reservation_type,
+            validated_data,
+        )
+
+
+def stays_overlap(stay, other):
+    """Return True if the [check_in, check_out) ranges share a night"""
+    return stay.lower < other.upper and other.lower < stay.upper
+
+
+def hotel_identity(item):
+    """Return the hotel of a booking item, as the database compares it"""
+    return tuple(' '.join(item.get(field, '').split()).lower()
+                 for field in ('name', 'address'))
+
+
+class HotelAndResidenceListSerializer(
+        StayConflictMixin, ReservationItemListSerializer):
+    """Batch of hotel bookings, stay conflicts are reported per item"""
+
+    def to_internal_value(self, data):
+        """Refuse the items overlapping an earlier item of the batch
+
+        Checked here rather than in validate(), whose errors would not
+        be reported per item.
+        """
+        attrs = super().to_internal_value(data)
+        errors, stays = [], {}
+        for item in attrs:
+            stay = item.get('stay')
+            booked = stays.setdefault(hotel_identity(item), [])
+            if stay and any(stays_overlap(stay, other) for other in booked):
+                errors.append({'stay': [STAY_CONFLICT]})
+                continue
+            if stay:
+                booked.append(stay)
+            errors.append({})
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return attrs
+
+    def stay_conflict_errors(self):
+        """Return per item errors, finding the booked stays in one query"""
+        booking = {
+            f'item_{i}': Count('pk', filter=Q(
+                hotel_name=normalized(Value(item['name'])),
+                hotel_address=normalized(Value(item.get('address', ''))),
+                stay__overlap=item['stay']))
+            for i, item in enumerate(self.validated_data)
+            if item.get('stay')}
+        conflicts = HotelAndResidence.objects.annotate(
+            **HotelAndResidence.identity()).aggregate(**booking)
+        if not any(conflicts.values()):
+            # booked by a batch not committed yet, blame every stay
+            conflicts = dict.fromkeys(booking, 1)
+
+        return [{'stay': [STAY_CONFLICT]} if conflicts.get(f'item_{i}')
+                else {}
+                for i in range(len(self.validated_data))]
+
+
+class HotelAndResidenceSerializer(StayConflictMixin,
+                                  ReservationItemSerializer):
+    reservation_type = 'HOTEL_AND_RESIDENCE'
     reservation = ReservationSerializer(
         required=False, allow_null=True)
+    stay = StayField(required=False, allow_null=True)
     # reservation = serializers.PrimaryKeyRelatedField()
 
     class Meta:
         model = HotelAndResidence
+        list_serializer_class = HotelAndResidenceListSerializer
         fields = '__all__'
         read_only_fields = ['id']
         extra_kwargs = {
@@ -38,40 +191,15 @@ class HotelAndResidenceSerializer(serializers.ModelSerializer):
             'cost': {'required': False},
         }
 
-    def create(self, validated_data):
-        user = self.context['request'].user  # type: ignore
-        user_id = user.id  # type: ignore
-        has_reservation = Reservation.objects.filter(user=user).exists()
-        reservation_data = validated_data.pop('reservation', None)
-
-        if has_reservation:
-            reservation = Reservation.objects.filter(user=user.id).first()
-            reservation.type = 'HOTEL_AND_RESIDENCE'  # type: ignore
-            reservation.save()  # type: ignore
-
-        elif reservation_data is not None and reservation_data.get('user') \
-                and reservation_data['user']['id'] == user_id:
-            reservation = reservation_data.get('id')
-
-        else:
-            reservation = Reservation.objects.create(
-                user=user,
-                title=user.first_name,
-                type='HOTEL_AND_RESIDENCE'
-            )
-
-        hotel = HotelAndResidence.objects.create(
-            reservation=reservation, **validated_data)
 
-        return hotel
-
-
-class TouristTourSerializer(serializers.ModelSerializer):
+class TouristTourSerializer(ReservationItemSerializer):
+    reservation_type = 'TOURIST_TOUR'
     reservation = ReservationSerializer(
         required=False, allow_null=True)
 
     class Meta:
         model = TouristTour
+        list_serializer_class = ReservationItemListSerializer
         fields = '__all__'
         read_only_field = ['id']
         extra_kwargs = {
@@ -79,40 +207,15 @@ class TouristTourSerializer(serializers.ModelSerializer):
             'cost': {'required': False},
         }
 
-    def create(self, validated_data):
-        user = self.context['request'].user  # type: ignore
-        user_id = user.id  # type: ignore
-        has_reservation = Reservation.objects.filter(user=user).exists()
-        reservation_data = validated_data.pop('reservation', None)
-
-        if has_reservation:
-            reservation = Reservation.objects.filter(user=user.id).first()
-            reservation.type = 'TOURIST_TOUR'  # type: ignore
-            reservation.save()  # type: ignore
-
-        elif reservation_data is not None and reservation_data.get('user')\
-                and reservation_data['user']['id'] == user_id:
-            reservation = reservation_data.get('id')
 
-        else:
-            reservation = Reservation.objects.create(
-                user=user,
-                title=user.first_name,
-                type='TOURIST_TOUR'
-            )
-
-        tour = TouristTour.objects.create(
-            reservation=reservation, **validated_data)
-
-        return tour
-
-
-class TravelAgencySerializer(serializers.ModelSerializer):
+class TravelAgencySerializer(ReservationItemSerializer):
+    reservation_type = 'TRAVEL_AGENCY'
     reservation = ReservationSerializer(
         required=False, allow_null=True)
 
     class Meta:
         model = TravelAgency
+        list_serializer_class = ReservationItemListSerializer
         fields = '__all__'
         read_only_field = ['id']
         extra_kwargs = {
@@ -120,41 +223,41 @@ class TravelAgencySerializer(serializers.ModelSerializer):
             'cost': {'required': False},
         }
 
-    def create(self, validated_data):
-        user = self.context['request'].user  # type: ignore
-        user_id = user.id  # type: ignore
-        has_reservation = Reservation.objects.filter(user=user).exists()
-        reservation_data = validated_data.pop('reservation', None)
 
-        if has_reservation:
-            reservation = Reservation.objects.filter(user=user.id).first()
-            reservation.type = 'TRAVEL_AGENCY'  # type: ignore
-            reservation.save()  # type: ignore
+class HotelAndResidenceItemSerializer(HotelAndResidenceSerializer):
+    """Hotel nested in its reservation, which is only referenced by id"""
+    reservation = serializers.PrimaryKeyRelatedField(read_only=True)
 
-        elif reservation_data is not None and reservation_data.get('user')\
-                and reservation_data['user']['id'] == user_id:
-            reservation = reservation_data.get('id')
 
-        else:
-            reservation = Reservation.objects.create(
-                user=user,
-                title=user.first_name,
-                type='TRAVEL_AGENCY'
-            )
+class TouristTourItemSerializer(TouristTourSerializer):
+    """Tour nested in its reservation, which is only referenced by id"""
+    reservation = serializers.PrimaryKeyRelatedField(read_only=True)
 
-        agency = TravelAgency.objects.create(
-            reservation=reservation, **validated_data)
 
-        return agency
+class TravelAgencyItemSerializer(TravelAgencySerializer):
+    """Agency nested in its reservation, which is only referenced by id"""
+    reservation = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class HotelAvailabilitySerializer(serializers.ModelSerializer):
+    """Hotel free for the requested dates
+
+    Only the hotel identity is returned, the row it is read from is
+    another user's booking whose id and price are not theirs to see.
+    """
+    class Meta:
+        model = HotelAndResidence
+        fields = ['name', 'address', 'type_hotel', 'star']
+        read_only_fields = fields
 
 
 class ReservationDetailSerializer(ReservationSerializer):
     """Serializer for reservations detail views"""
-    hotels = HotelAndResidenceSerializer(
+    hotels = HotelAndResidenceItemSerializer(
         read_only=True, many=True, source='hotelandresidence_set')
-    tours = TouristTourSerializer(
+    tours = TouristTourItemSerializer(
         read_only=True, many=True, source='touristtour_set')
-    travel = TravelAgencySerializer(
+    travel = TravelAgencyItemSerializer(
         read_only=True, many=True, source='travelagency_set')
 
     class Meta(ReservationSerializer.Meta):
@@ -0,0 +1,79 @@
+"""Services shared by the reservation serializers"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from core.models import HotelAndResidence, Reservation
+
+
+def _first_reservation(user):
+    """Return the oldest reservation of the user, locked for update"""
+    return Reservation.objects.select_for_update()\
+        .filter(user=user).order_by('pk').first()
+
+
+def attach_reservation(user, reservation_type):
+    """Return the reservation the user's items are attached to.
+
+    The oldest reservation of the user is reused and switched to
+    reservation_type, or created if the user has none. Must run inside
+    a transaction: the reservation row is locked, and when it is missing
+    the user row is locked so that concurrent requests of the same user
+    create a single reservation.
+    """
+    reservation = _first_reservation(user)
+    if reservation is None:
+        get_user_model().objects.select_for_update()\
+            .only('pk').get(pk=user.pk)
+        reservation = _first_reservation(user)
+
+    if reservation is None:
+        return Reservation.objects.create(
+            user=user,
+            title=user.first_name,
+            type=reservation_type,
+        )
+
+    if reservation.type != reservation_type:
+        reservation.type = reservation_type
+        reservation.save(update_fields=['type', 'updated_at'])
+
+    return reservation
+
+
+@transaction.atomic
+def create_item(model, user, reservation_type, validated_data):
+    """Create a hotel, tour or agency attached to the user's reservation"""
+    reservation = attach_reservation(user, reservation_type)
+    return model.objects.create(reservation=reservation, **validated_data)
+
+
+@transaction.atomic
+def create_items(model, user, reservation_type, validated_data):
+    """Create a batch of items attached to the user's reservation
+
+    The reservation is resolved once and the items are written with a
+    single multi-row INSERT.
+    """
+    reservation = attach_reservation(user, reservation_type)
+    return model.objects.bulk_create(
+        model(reservation=reservation, **data) for data in validated_data)
+
+
+def available_hotels(stay):
+    """Return one row per hotel with no booking overlapping stay
+
+    The NOT EXISTS probes on the hotel identity are answered by the GiST
+    index of the hotel's exclusion constraint. The latest booking row
+    stands for the hotel, without DISTINCT ON, so the result can still
+    be filtered and ordered, e.g. by search similarity.
+    """
+    hotels = HotelAndResidence.objects.annotate(
+        **HotelAndResidence.identity())
+    same_hotel = {'hotel_name': OuterRef('hotel_name'),
+                  'hotel_address': OuterRef('hotel_address')}
+    booked = hotels.filter(stay__overlap=stay, **same_hotel)
+    newer = hotels.filter(pk__gt=OuterRef('pk'), **same_hotel)
+    return hotels.filter(~Exists(booked), ~Exists(newer))\
+        .order_by('hotel_name', 'hotel_address')
@@ -1,6 +1,6 @@
 """Test for reservation API"""
 
-from datetime import datetime
+from decimal import Decimal
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
@@ -8,10 +8,19 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Reservation
-from reservation.serializer import ReservationSerializer
+from core.models import (
+    Reservation,
+    HotelAndResidence,
+    TouristTour,
+    TravelAgency,
+)
+from reservation.serializer import (
+    ReservationDetailSerializer,
+    ReservationSerializer,
+)
 
 RESERVATION_URL = reverse('reservation:reservation-list')
+HOTEL_URL = reverse('reservation:HotelAndResidence-list')
 
 
 def create_reservation(user, **params):  # helper function
@@ -20,9 +29,7 @@ def create_reservation(user, **params):  # helper function
     defaults = {
         'title': 'test res',
         'detail': 'test det',
-        'type': 'hotel',
-        'created_at': datetime.now(),
-        'updated_at': datetime.now(),
+        'type': 'HOTEL_AND_RESIDENCE',
     }
     # for override value in default data model of reservation
     defaults.update(params)
@@ -38,7 +45,21 @@ def create_user(**params):
 
 def detail_url(reservation_id):
     """Create and return a reservation detail url"""
-    return reverse('reservation:reservation-detail')
+    return reverse('reservation:reservation-detail', args=[reservation_id])
+
+
+def create_items(reservation, count=2):
+    """Create hotels, tours and agencies of the reservation"""
+    for i in range(count):
+        HotelAndResidence.objects.create(
+            reservation=reservation, name=f'hotel {i}', address='address',
+            facilities='facilities', cost=Decimal('10.00'))
+        TouristTour.objects.create(
+            reservation=reservation, name=f'tour {i}',
+            facilities='facilities', cost=Decimal('20.00'))
+        TravelAgency.objects.create(
+            reservation=reservation, name=f'agency {i}',
+            cost=Decimal('30.00'))
 
 
 class PublicReservationTest(TestCase):
@@ -68,21 +89,22 @@ class PrivateReservationTest(TestCase):
 
     def test_retrieve_reservation(self):
         """Test retrieving a list of reservation"""
-        create_user(user=self.user)
-        create_user(user=self.user)
+        create_reservation(user=self.user)
+        create_reservation(user=self.user)
 
         response = self.client.get(RESERVATION_URL)
 
-        reservation = Reservation.objects.all().order_by('-id')
+        reservation = Reservation.objects.all().order_by('-created_at')
         serializer = ReservationSerializer(reservation, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)  # type: ignore
+        self.assertEqual(response.data['results'],  # type: ignore
+                         serializer.data)
 
     def test_reservation_list_to_user(self):
         """Test list of reservation is limited authenticated user."""
 
         unathen_user = create_user(
-            email='test@example.com', password='psastest123')
+            email='other@example.com', password='psastest123')
 
         create_reservation(user=unathen_user)
         create_reservation(user=self.user)
@@ -92,10 +114,28 @@ class PrivateReservationTest(TestCase):
         reservation = Reservation.objects.filter(user=self.user)
         serializer = ReservationSerializer(reservation, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)  # type: ignore
+        self.assertEqual(response.data['results'],  # type: ignore
+                         serializer.data)
 
         # for access specific item in model with url
 
+    def test_reservation_list_paginated(self):
+        """Test the reservation list is split into cursor pages"""
+        for i in range(3):
+            create_reservation(user=self.user, title=f'res {i}')
+
+        response = self.client.get(RESERVATION_URL, {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)  # type: ignore
+        self.assertIsNone(response.data['previous'])  # type: ignore
+
+        response = self.client.get(response.data['next'])  # type: ignore
+
+        self.assertEqual([r['title'] for r in response.data['results']],
+                         ['res 0'])  # type: ignore
+        self.assertIsNone(response.data['next'])  # type: ignore
+
     def test_get_reservation_detail(self):
         """Test get reservation detail"""
         reservation = create_reservation(user=self.user)
@@ -103,7 +143,7 @@ class PrivateReservationTest(TestCase):
         url = detail_url(reservation_id=reservation.id)  # type: ignore
         response = self.client.get(url)
 
-        serializer = ReservationSerializer(reservation)
+        serializer = ReservationDetailSerializer(reservation)
         self.assertEqual(response.data, serializer.data)  # type: ignore
 
     def test_create_reservation(self):
@@ -111,9 +151,7 @@ class PrivateReservationTest(TestCase):
         payload = {
             'title': 'test create',
             'detail': 'test det',
-            'type': 'tourism',
-            'created_at': datetime.now(),
-            'updated_at': datetime.now(),
+            'type': 'TOURIST_TOUR',
         }
         response = self.client.post(RESERVATION_URL, payload)
 
@@ -121,14 +159,14 @@ class PrivateReservationTest(TestCase):
         reservation = Reservation.objects.get(
             id=response.data['id'])  # type: ignore
 
-        for v, k in payload.items():
+        for k, v in payload.items():
             self.assertEqual(getattr(reservation, k), v)
         self.assertEqual(reservation.user, self.user)
 
     def test_partial_update(self):
         """Test partial update of a reservation"""
 
-        original_type = 'hotel'
+        original_type = 'HOTEL_AND_RESIDENCE'
         reservation = create_reservation(
             user=self.user,
             title='HELLO',
@@ -150,22 +188,18 @@ class PrivateReservationTest(TestCase):
             user=self.user,
             title='test ti',
             detail='test det',
-            type='hotel',
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
+            type='HOTEL_AND_RESIDENCE',
         )
         payload = {
             'title': 'newt create',
             'detail': 'newt det',
-            'type': 'agency',
-            'created_at': datetime.now(),
-            'updated_at': datetime.now(),
+            'type': 'TRAVEL_AGENCY',
         }
 
         url = detail_url(reservation_id=reservation.id)  # type: ignore
         response = self.client.put(url, payload)
 
-        self.assertEqual(response, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
         reservation.refresh_from_db()
         for k, v in payload.items():
             self.assertEqual(getattr(reservation, k), v)
@@ -176,14 +210,13 @@ class PrivateReservationTest(TestCase):
         new_user = create_user(email='newtest@example.com',
                                password='newpasstest123')
 
-        reservation = create_reservation(user=new_user)
+        reservation = create_reservation(user=self.user)
 
         payload = {'user': new_user.id}
 
         url = detail_url(reservation_id=reservation.id)  # type: ignore
         self.client.patch(url, payload)
-        # TODO:check here !
-        # i thin should not be equal!
+
         reservation.refresh_from_db()
         self.assertEqual(reservation.user, self.user)
 
@@ -196,7 +229,7 @@ class PrivateReservationTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Reservation.objects.filter(
-            id=Reservation.id).exists())  # type: ignore
+            id=reservation.id).exists())  # type: ignore
 
     def test_delete_other_users_reservation_error(self):
         """Test trying to delete another users reservation,gives error"""
@@ -212,3 +245,340 @@ class PrivateReservationTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertTrue(Reservation.objects.filter(
             id=reservation.id).exists())  # type: ignore
+
+
+class ReservationQueryCountTest(TestCase):
+    """Test the number of queries of the reservation APIs"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='passtestres123',
+            phone_number=4756987456
+        )
+        self.client.force_authenticate(self.user)
+        self.reservation = create_reservation(user=self.user)
+
+    def test_detail_query_count(self):
+        """Test the detail loads each kind of item in one query"""
+        create_items(self.reservation, count=3)
+        url = detail_url(reservation_id=self.reservation.id)  # type: ignore
+
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['hotels']), 3)  # type: ignore
+        self.assertEqual(response.data['hotels'][0]['reservation'],
+                         self.reservation.id)  # type: ignore
+
+    def test_detail_query_count_constant(self):
+        """Test the detail queries do not grow with the items"""
+        create_items(self.reservation, count=10)
+        url = detail_url(reservation_id=self.reservation.id)  # type: ignore
+
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+    def test_partial_update_query_count(self):
+        """Test an update reads, writes and loads each kind of item once"""
+        create_items(self.reservation, count=10)
+        url = detail_url(reservation_id=self.reservation.id)  # type: ignore
+
+        with self.assertNumQueries(5):
+            response = self.client.patch(url, {'title': 'new title'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['tours']), 10)  # type: ignore
+
+    def test_hotel_list_query_count(self):
+        """Test listing hotels loads their reservations in the same query"""
+        create_items(self.reservation, count=5)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(HOTEL_URL)
+
+        self.assertEqual(len(response.data['results']), 5)  # type: ignore
+
+
+class BulkCreateItemsTest(TestCase):
+    """Test creating reservation items in bulk"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='passtestres123',
+            phone_number=4756987456
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_hotels(self):
+        """Test a list of hotels is created under one reservation"""
+        payload = [
+            {'name': f'hotel {i}', 'address': 'address', 'cost': '10.00'}
+            for i in range(3)
+        ]
+
+        response = self.client.post(HOTEL_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([h['name'] for h in response.data],  # type: ignore
+                         ['hotel 0', 'hotel 1', 'hotel 2'])
+        reservation = Reservation.objects.get(user=self.user)
+        self.assertEqual(reservation.type, 'HOTEL_AND_RESIDENCE')
+        self.assertEqual(HotelAndResidence.objects.filter(
+            reservation=reservation).count(), 3)
+
+    def test_bulk_create_returns_item_errors(self):
+        """Test an invalid item rejects the batch with per item errors"""
+        payload = [
+            {'name': 'hotel', 'cost': '10.00'},
+            {'name': 'hotel', 'cost': '10.00', 'star': 9},
+        ]
+
+        response = self.client.post(HOTEL_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})  # type: ignore
+        self.assertIn('star', response.data[1])  # type: ignore
+        self.assertFalse(HotelAndResidence.objects.exists())
+
+    def test_bulk_create_empty_list_error(self):
+        """Test an empty list is refused without touching reservations"""
+        response = self.client.post(HOTEL_URL, [], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_update_with_list_error(self):
+        """Test a list body on update is a validation error, not a crash"""
+        reservation = create_reservation(user=self.user)
+        create_items(reservation, count=1)
+        hotel = HotelAndResidence.objects.get()
+        url = reverse('reservation:HotelAndResidence-detail', args=[hotel.id])
+
+        response = self.client.patch(url, [{'name': 'new'}], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        hotel.refresh_from_db()
+        self.assertEqual(hotel.name, 'hotel 0')
+
+    def test_single_create_still_works(self):
+        """Test posting one object still creates one item"""
+        payload = {'name': 'agency', 'cost': '30.00'}
+
+        response = self.client.post(
+            reverse('reservation:TravelAgency-list'), payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(TravelAgency.objects.get().name, 'agency')
+
+
+class HotelStayTest(TestCase):
+    """Test booking hotels for date ranges"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='passtestres123',
+            phone_number=4756987456
+        )
+        self.client.force_authenticate(self.user)
+
+    def book(self, name, check_in, check_out, address='address'):
+        payload = {
+            'name': name, 'address': address, 'cost': '10.00',
+            'stay': {'check_in': check_in, 'check_out': check_out},
+        }
+        return self.client.post(HOTEL_URL, payload, format='json')
+
+    def test_book_stay(self):
+        """Test a stay is stored and returned with its dates"""
+        response = self.book('hotel', '2024-05-01', '2024-05-04')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['stay'], {  # type: ignore
+            'check_in': '2024-05-01', 'check_out': '2024-05-04'})
+
+    def test_overlapping_stay_rejected(self):
+        """Test booking a hotel already booked for the dates fails"""
+        self.book('hotel', '2024-05-01', '2024-05-04')
+
+        response = self.book('hotel', '2024-05-03', '2024-05-06')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('stay', response.data)  # type: ignore
+        self.assertEqual(HotelAndResidence.objects.count(), 1)
+
+    def test_name_variant_of_booked_hotel_rejected(self):
+        """Test case and spacing of the name do not bypass the check"""
+        self.book('Grand Hotel', '2024-05-01', '2024-05-04')
+
+        response = self.book(' grand   HOTEL', '2024-05-03', '2024-05-06')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('stay', response.data)  # type: ignore
+
+    def test_same_name_other_hotel_allowed(self):
+        """Test hotels sharing a name at other addresses do not clash"""
+        self.book('Grand Hotel', '2024-05-01', '2024-05-04', 'Tehran')
+
+        response = self.book('Grand Hotel', '2024-05-01', '2024-05-04',
+                             'Shiraz')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_back_to_back_stays_allowed(self):
+        """Test a stay may start on the check-out day of another"""
+        self.book('hotel', '2024-05-01', '2024-05-04')
+
+        response = self.book('hotel', '2024-05-04', '2024-05-06')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_check_out_before_check_in_rejected(self):
+        """Test a stay must end after it starts"""
+        response = self.book('hotel', '2024-05-04', '2024-05-04')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('stay', response.data)  # type: ignore
+
+    def test_bulk_stay_conflicts_reported_per_item(self):
+        """Test a batch names the items booked by earlier stays"""
+        self.book('hotel', '2024-05-01', '2024-05-04')
+        payload = [
+            {'name': 'hotel', 'address': 'address',
+             'stay': {'check_in': '2024-05-10', 'check_out': '2024-05-12'}},
+            {'name': 'hotel', 'address': 'address',
+             'stay': {'check_in': '2024-05-03', 'check_out': '2024-05-05'}},
+        ]
+
+        response = self.client.post(HOTEL_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})  # type: ignore
+        self.assertIn('stay', response.data[1])  # type: ignore
+        self.assertEqual(HotelAndResidence.objects.count(), 1)
+
+    def test_bulk_overlapping_stays_within_batch(self):
+        """Test two items of a batch booking the same nights are refused"""
+        stay = {'check_in': '2024-05-01', 'check_out': '2024-05-04'}
+        payload = [
+            {'name': 'Hotel', 'address': 'address', 'stay': stay},
+            {'name': 'hotel ', 'address': 'address', 'stay': stay},
+        ]
+
+        response = self.client.post(HOTEL_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})  # type: ignore
+        self.assertIn('stay', response.data[1])  # type: ignore
+        self.assertFalse(HotelAndResidence.objects.exists())
+
+    def test_available_hotels(self):
+        """Test availability lists only hotels free for the dates"""
+        self.book('booked', '2024-05-01', '2024-05-04')
+        self.book('free', '2024-05-10', '2024-05-12')
+
+        response = self.client.get(reverse(
+            'reservation:HotelAndResidence-available'), {
+            'check_in': '2024-05-02', 'check_out': '2024-05-05'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([h['name'] for h in response.data],  # type: ignore
+                         ['free'])
+
+    def test_available_hotels_hide_other_users_bookings(self):
+        """Test availability only shows the identity of other's hotels"""
+        other = create_user(email='other@example.com',
+                            password='passtestres123')
+        reservation = create_reservation(user=other)
+        HotelAndResidence.objects.create(
+            reservation=reservation, name='hotel', address='address',
+            facilities='private', cost=Decimal('99.00'))
+
+        response = self.client.get(reverse(
+            'reservation:HotelAndResidence-available'), {
+            'check_in': '2024-05-02', 'check_out': '2024-05-05'})
+
+        self.assertEqual(response.data, [{  # type: ignore
+            'name': 'hotel', 'address': 'address',
+            'type_hotel': 'NOTSET', 'star': 1}])
+
+    def test_search_available_hotels(self):
+        """Test availability can be searched, best match first"""
+        self.book('Grand Palace', '2024-05-10', '2024-05-12')
+        self.book('Grand Palace', '2024-06-10', '2024-06-12')
+        self.book('Park Inn', '2024-05-10', '2024-05-12')
+
+        response = self.client.get(reverse(
+            'reservation:HotelAndResidence-available'), {
+            'check_in': '2024-05-02', 'check_out': '2024-05-05',
+            'search': 'pallace'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([h['name'] for h in response.data],  # type: ignore
+                         ['Grand Palace'])
+
+
+class HotelSearchTest(TestCase):
+    """Test searching and filtering the user's hotels"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='passtestres123',
+            phone_number=4756987456
+        )
+        self.client.force_authenticate(self.user)
+        reservation = create_reservation(user=self.user)
+        for name, address, star, cost, type_hotel in [
+            ('Grand Palace', 'Ferdowsi street', 5, '90.00', 'HOTEL'),
+            ('Grand Inn', 'Hafez street', 3, '40.00', 'HOTEL'),
+            ('Park Residence', 'Saadi street', 4, '60.00', 'RESIDENCE'),
+        ]:
+            HotelAndResidence.objects.create(
+                reservation=reservation, name=name, address=address,
+                facilities='facilities', star=star, cost=Decimal(cost),
+                type_hotel=type_hotel)
+
+    def names(self, params):
+        response = self.client.get(HOTEL_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [h['name'] for h in response.data['results']]  # type: ignore
+
+    def test_search_tolerates_typos(self):
+        """Test search matches misspelled words, best match first"""
+        self.assertEqual(self.names({'search': 'pallace'}),
+                         ['Grand Palace'])
+
+    def test_search_paged_by_offset(self):
+        """Test equally similar results are paged without repeats"""
+        first = self.client.get(HOTEL_URL, {'search': 'grand', 'limit': 1})
+        second = self.client.get(first.data['next'])  # type: ignore
+
+        names = [h['name'] for h in first.data['results']  # type: ignore
+                 + second.data['results']]  # type: ignore
+        self.assertCountEqual(names, ['Grand Palace', 'Grand Inn'])
+        self.assertIsNone(second.data['next'])  # type: ignore
+
+    def test_search_address(self):
+        """Test search also matches the address"""
+        self.assertEqual(self.names({'search': 'hafez'}), ['Grand Inn'])
+
+    def test_filter_star_and_cost(self):
+        """Test star and cost range filters combine"""
+        names = self.names({'star__gte': 4, 'cost_max': '80.00'})
+
+        self.assertEqual(names, ['Park Residence'])
+
+    def test_filter_type_with_search(self):
+        """Test filters apply together with the search"""
+        names = self.names({'search': 'grand', 'type_hotel': 'HOTEL',
+                            'cost_min': '50.00'})
+
+        self.assertEqual(names, ['Grand Palace'])
@@ -0,0 +1,97 @@
+"""Tests for the reservation services"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TransactionTestCase
+from psycopg2.extras import DateRange
+
+from core.models import HotelAndResidence, Reservation
+from reservation import services
+
+
+def create_user(**params):
+    """Create and return new user."""
+    return get_user_model().objects.create_user(**params)  # type: ignore
+
+
+class CreateItemTests(TransactionTestCase):
+    """Test attaching items to the user's reservation"""
+
+    def setUp(self):
+        self.user = create_user(
+            email='test@example.com',
+            password='passtestres123',
+            first_name='test',
+            phone_number=4756987456,
+        )
+
+    def create_hotel(self, name='hotel', stay=None):
+        return services.create_item(
+            HotelAndResidence, self.user, 'HOTEL_AND_RESIDENCE', {
+                'name': name,
+                'address': 'address',
+                'facilities': 'facilities',
+                'cost': Decimal('10.00'),
+                'stay': stay,
+            })
+
+    def test_create_item_creates_reservation(self):
+        """Test the first item creates the user's reservation"""
+        hotel = self.create_hotel()
+
+        reservation = Reservation.objects.get(user=self.user)
+        self.assertEqual(hotel.reservation, reservation)
+        self.assertEqual(reservation.type, 'HOTEL_AND_RESIDENCE')
+        self.assertEqual(reservation.title, self.user.first_name)
+
+    def test_create_item_reuses_reservation(self):
+        """Test later items reuse and retype the existing reservation"""
+        reservation = Reservation.objects.create(
+            user=self.user, title='trip', type='TOURIST_TOUR')
+
+        hotel = self.create_hotel()
+
+        reservation.refresh_from_db()
+        self.assertEqual(hotel.reservation, reservation)
+        self.assertEqual(reservation.type, 'HOTEL_AND_RESIDENCE')
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_concurrent_creates_share_one_reservation(self):
+        """Test parallel creates of one user never duplicate reservations"""
+        def create(i):
+            try:
+                return self.create_hotel(name=f'hotel {i}').reservation_id
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            reservation_ids = set(executor.map(create, range(32)))
+
+        self.assertEqual(len(reservation_ids), 1)
+        self.assertEqual(Reservation.objects.filter(user=self.user).count(),
+                         1)
+        self.assertEqual(HotelAndResidence.objects.count(), 32)
+
+    def test_concurrent_bookings_of_one_stay(self):
+        """Test only one of parallel bookings of the same dates succeeds"""
+        stay = DateRange(date(2024, 5, 1), date(2024, 5, 4))
+
+        def book(i):
+            try:
+                with transaction.atomic():
+                    self.create_hotel(stay=stay)
+                return True
+            except IntegrityError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            booked = list(executor.map(book, range(16)))
+
+        self.assertEqual(booked.count(True), 1)
+        self.assertEqual(HotelAndResidence.objects.count(), 1)
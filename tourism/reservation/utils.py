@@ -9,3 +9,18 @@ class EnablePartialUpdateMixin:
     def update(self, request, *args, **kwargs):
         kwargs['partial'] = True
         return super().update(request, *args, **kwargs)
+
+
+class BulkCreateMixin:
+    """Enable creating a list of objects in one request
+
+    The list is validated and saved as a whole by the serializer's
+    list_serializer_class, errors are returned per item. An empty list
+    is refused, lists are only accepted when creating.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == 'create' and isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+            kwargs['allow_empty'] = False
+        return super().get_serializer(*args, **kwargs)
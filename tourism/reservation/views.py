@@ -1,10 +1,16 @@
 """Views for Reservation APIs"""
 
 from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django_filters.rest_framework import DjangoFilterBackend
 
-from rest_framework import filters
+from core.pagination import CreatedAtCursorPagination, RankPagination
+from reservation import services
+from reservation.filters import HotelAndResidenceFilter, TrigramSearchFilter
+from reservation.utils import BulkCreateMixin
+from user.authentication import CachedTokenAuthentication
 from core.models import (Reservation, HotelAndResidence,
                          TravelAgency, TouristTour)
 from reservation.serializer import (
@@ -12,20 +18,34 @@ from reservation.serializer import (
     TravelAgencySerializer,
     ReservationSerializer,
     HotelAndResidenceSerializer,
+    HotelAvailabilitySerializer,
+    StayField,
     TouristTourSerializer
 )
 
 
+DETAIL_PREFETCH = ['hotelandresidence_set', 'touristtour_set',
+                   'travelagency_set']
+
+
 class ReservationView(viewsets.ModelViewSet):
     """View for manage reservation APIs"""
     serializer_class = ReservationDetailSerializer
     queryset = Reservation.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    # relations each action's serializer reads, loaded in one query each.
+    # update() drops the prefetched objects after saving and the response
+    # loads each relation in one query anyway, prefetching would repeat it
+    prefetch_plan = {
+        'retrieve': DETAIL_PREFETCH,
+    }
 
     def get_queryset(self):
         """Retrieve reservations for authenticated user."""
         return self.queryset.filter(user=self.request.user)\
+            .prefetch_related(*self.prefetch_plan.get(self.action, []))\
             .order_by('-created_at')
 
     def get_serializer_class(self):
@@ -40,37 +60,66 @@ class ReservationView(viewsets.ModelViewSet):
         serializers.save(user=self.request.user)
 
 
-class HotelAndResidenceView(viewsets.ModelViewSet):
+class HotelAndResidenceView(BulkCreateMixin, viewsets.ModelViewSet):
+    """View for manage hotel bookings APIs
+
+    ``?search=`` ranks hotels by trigram similarity of name/address, paged
+    with ``?limit=&offset=``, and
+    ``?type_hotel=&star=&star__gte=&cost_min=&cost_max=`` narrow them.
+
+    ``available/?check_in=YYYY-MM-DD&check_out=YYYY-MM-DD`` lists the
+    hotels with no booking overlapping the stay, with the same filters.
+    """
     serializer_class = HotelAndResidenceSerializer
     queryset = HotelAndResidence.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
-    filterset_fields = ['name']
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['$name']
+    filterset_class = HotelAndResidenceFilter
+    filter_backends = [DjangoFilterBackend, TrigramSearchFilter]
+    search_fields = ['name', 'address']
 
     def get_queryset(self):
         user = self.request.user
-        return self.queryset.filter(reservation__user=user)
+        return self.queryset.filter(reservation__user=user)\
+            .select_related('reservation')
+
+    @property
+    def paginator(self):
+        """Page search results, ranked by similarity, by offset"""
+        if not hasattr(self, '_paginator') and self.pagination_class \
+                and TrigramSearchFilter().is_searching(self.request, self):
+            self._paginator = RankPagination()
+
+        return super().paginator
+
+    @action(detail=False, pagination_class=None)
+    def available(self, request):
+        """Return the hotels free from ?check_in= to ?check_out="""
+        stay = StayField().run_validation(request.query_params.dict())
+        queryset = self.filter_queryset(services.available_hotels(stay))
+        serializer = HotelAvailabilitySerializer(queryset, many=True)
+        return Response(serializer.data)
 
 
-class TourismTourView(viewsets.ModelViewSet):
+class TourismTourView(BulkCreateMixin, viewsets.ModelViewSet):
     serializer_class = TouristTourSerializer
     queryset = TouristTour.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
-        return self.queryset.filter(reservation__user=user)
+        return self.queryset.filter(reservation__user=user)\
+            .select_related('reservation')
 
 
-class TravelAgencyView(viewsets.ModelViewSet):
+class TravelAgencyView(BulkCreateMixin, viewsets.ModelViewSet):
     serializer_class = TravelAgencySerializer
     queryset = TravelAgency.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
-        return self.queryset.filter(reservation__user=user)
+        return self.queryset.filter(reservation__user=user)\
+            .select_related('reservation')
@@ -0,0 +1,159 @@
+"""Authentication backends for the API"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def expired_before():
+    """Return the creation time before which tokens are expired"""
+    return timezone.now() - timedelta(seconds=settings.AUTH_TOKEN_TTL)
+
+
+def issue_token(user):
+    """Return the token of user, replacing it once expired"""
+    Token.objects.filter(user=user, created__lt=expired_before()).delete()
+    token, created = Token.objects.get_or_create(user=user)
+    return token
+
+
+class TokenCache:
+    """Cache of token key -> (user, token) entries with a TTL
+
+    When ``SHARED_CACHE`` names a cache alias the entries only live in
+    that cache, so an invalidation by any worker is seen by all of them.
+    Otherwise they live in a bounded LRU of the process, and the other
+    workers keep their entries of a deleted token or changed user until
+    they expire after ``TTL``.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+
+    @property
+    def options(self):
+        return settings.AUTH_TOKEN_CACHE
+
+    @property
+    def shared(self):
+        alias = self.options.get('SHARED_CACHE')
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def _key(key):
+        return f'auth-token:{key}'
+
+    @staticmethod
+    def _user_key(user_pk):
+        return f'auth-token-user:{user_pk}'
+
+    def get(self, key):
+        """Return the cached (user, token) of key, or None"""
+        shared = self.shared
+        if shared:
+            return shared.get(self._key(key))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return value
+                self._pop(key)
+
+        return None
+
+    def set(self, key, value):
+        """Cache the (user, token) of key"""
+        shared = self.shared
+        if shared:
+            timeout = self.options['TTL']
+            user_pk = value[0].pk
+            shared.set_many({self._key(key): value,
+                             self._user_key(user_pk): key}, timeout)
+        else:
+            self._remember(key, value)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (time.monotonic() + self.options['TTL'],
+                                  value)
+            self._user_keys.setdefault(value[0].pk, set()).add(key)
+            while len(self._entries) > self.options['MAX_SIZE']:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            user_pk = entry[1][0].pk
+            keys = self._user_keys.get(user_pk, set())
+            keys.discard(key)
+            if not keys:
+                self._user_keys.pop(user_pk, None)
+
+    def invalidate(self, key):
+        """Forget the token key"""
+        with self._lock:
+            self._pop(key)
+        shared = self.shared
+        if shared:
+            shared.delete(self._key(key))
+
+    def invalidate_user(self, user_pk):
+        """Forget every token of the user"""
+        with self._lock:
+            keys = list(self._user_keys.get(user_pk, ()))
+            for key in keys:
+                self._pop(key)
+        shared = self.shared
+        if shared:
+            shared_key = shared.get(self._user_key(user_pk))
+            if shared_key is not None:
+                keys.append(shared_key)
+            shared.delete_many([self._key(key) for key in keys] +
+                               [self._user_key(user_pk)])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication reading token -> user from ``token_cache``
+
+    Saves the Token/User query of every authenticated request while the
+    token is cached. The cache is invalidated when the token is deleted
+    or the user saved, which covers deactivation. Tokens older than
+    ``AUTH_TOKEN_TTL`` seconds are rejected, cached or not.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+
+        user, token = cached
+        if token.created < expired_before():
+            token_cache.invalidate(key)
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+
+        # requests may change request.user, keep the cached one intact
+        return copy.copy(user), token
@@ -5,23 +5,29 @@ from django.utils.translation import gettext as _
 
 from rest_framework import serializers
 from core.models import Comment
+from core.serializers import ImageVariantsField
 
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for the user objects."""
     # first_name = serializers.CharField(required=False)
     image = serializers.ImageField(required=False)
+    image_variants = ImageVariantsField(source='image')
 
     class Meta:
         model = get_user_model()
         fields = ['id', 'email', 'password', 'first_name',
                   'last_name', 'first_time_login',
-                  'address', 'phone_number', 'card_info', 'image']
+                  'address', 'phone_number', 'card_info', 'image',
+                  'image_variants', 'image_width', 'image_height',
+                  'image_size', 'image_sha256', 'image_color']
         extra_kwargs = {'password':
                         {'write_only': True, 'min_length': 5},
                         'phone_number':
                         {'write_only': True, 'min_length': 11}, }
-        read_only_fields = ['id', 'first_time_login']
+        read_only_fields = ['id', 'first_time_login', 'image_width',
+                            'image_height', 'image_size', 'image_sha256',
+                            'image_color']
 
     def create(self, validated_data):
         """Create and return a user with encrypted password"""
@@ -29,18 +35,25 @@ class UserSerializer(serializers.ModelSerializer):
             objects.create_user(**validated_data)  # type: ignore
 
     def update(self, instance, validated_data):
+        """Update the user with one write of the changed columns"""
         password = validated_data.pop('password', None)
-        card_info = validated_data.pop('card_info', None)
-        user = super().update(instance, validated_data)
-
+        changed = []
+        for attr, value in validated_data.items():
+            if getattr(instance, attr) != value:
+                setattr(instance, attr, value)
+                changed.append(attr)
         if password:
-            user.set_password(password)
-            user.save()
-        if card_info:
-            user.set_card_info(card_info)
-            user.save()
+            instance.set_password(password)
+            changed.append('password')
+
+        if 'image' in changed:
+            # read from the upload while it is saved
+            changed += instance.IMAGE_METADATA_FIELDS
+            changed.append('image_variants_ready')
+        if changed:
+            instance.save(update_fields=changed + ['updated_at'])
 
-        return user
+        return instance
 
 
 class AuthTokenSerializer(serializers.Serializer):
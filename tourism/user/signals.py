@@ -0,0 +1,19 @@
+"""Signal handlers for the user app"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def forget_user_tokens(sender, instance, **kwargs):
+    """The cached user would miss the change, e.g. a deactivation"""
+    token_cache.invalidate_user(instance.pk)
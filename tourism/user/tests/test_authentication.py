@@ -0,0 +1,227 @@
+"""
+Tests for the cached token authentication
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import token_cache
+
+ME_URL = reverse('user:me')
+TOKEN_URL = reverse('user:token')
+TOKEN_ASYNC_URL = reverse('user:token-async')
+
+
+def create_user(**params):
+    """Create and return a new user"""
+    return get_user_model().objects.create_user(**params)  # type: ignore
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are cached and invalidated"""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='test',
+            phone_number='09145632578',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_second_request_skips_token_query(self):
+        """Test a cached token is authenticated without a query"""
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)  # type: ignore
+
+    def test_deleted_token_rejected(self):
+        """Test deleting the token invalidates the cached lookup"""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivating the user invalidates the cached lookup"""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE={
+        'MAX_SIZE': 1, 'TTL': 60, 'SHARED_CACHE': None})
+    def test_cache_is_bounded(self):
+        """Test the least recently used token is evicted"""
+        other = create_user(
+            email='other@example.com',
+            password='testpass123',
+            phone_number='09145632579',
+        )
+        other_client = APIClient()
+        other_client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=other)}')
+        self.client.get(ME_URL)
+        other_client.get(ME_URL)
+
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+    @override_settings(AUTH_TOKEN_CACHE={
+        'MAX_SIZE': 10, 'TTL': 60, 'SHARED_CACHE': 'default'})
+    def test_shared_cache(self):
+        """Test lookups are shared through the configured cache"""
+        self.client.get(ME_URL)
+        token_cache.clear()
+
+        with self.assertNumQueries(0):
+            self.client.get(ME_URL)
+
+        self.token.delete()
+        token_cache.clear()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE={
+        'MAX_SIZE': 10, 'TTL': 60, 'SHARED_CACHE': 'default'})
+    def test_shared_cache_invalidated_by_other_worker(self):
+        """Test an invalidation in the shared cache wins over the process"""
+        self.client.get(ME_URL)
+
+        # another worker deactivated the user and cleared the shared entry
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False)
+        caches['default'].clear()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenExpiryTests(TestCase):
+    """Test tokens expire after AUTH_TOKEN_TTL"""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='test',
+            phone_number='09145632578',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def expire_token(self):
+        Token.objects.filter(pk=self.token.pk).update(
+            created=timezone.now() - timedelta(days=31))
+
+    @override_settings(AUTH_TOKEN_TTL=60 * 60 * 24 * 30)
+    def test_expired_token_rejected(self):
+        """Test an expired token no longer authenticates"""
+        self.expire_token()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_TTL=60 * 60 * 24 * 30)
+    def test_login_replaces_expired_token(self):
+        """Test logging in issues a new token once the old one expired"""
+        self.expire_token()
+
+        res = self.client.post(TOKEN_URL, {
+            'email': self.user.email, 'password': 'testpass123'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['token'], self.token.key)  # type: ignore
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
+
+    def test_login_reuses_valid_token(self):
+        """Test logging in returns the token while it is valid"""
+        res = self.client.post(TOKEN_URL, {
+            'email': self.user.email, 'password': 'testpass123'})
+
+        self.assertEqual(res.data['token'], self.token.key)  # type: ignore
+
+
+class PasswordWorkFactorTests(TestCase):
+    """Test the tunable password work factor"""
+
+    def setUp(self):
+        token_cache.clear()
+        self.client = APIClient()
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_login_rehashes_with_new_work_factor(self):
+        """Test a password hashed with old iterations is rehashed"""
+        user = create_user(email='test@example.com', password='testpass123',
+                           phone_number='09145632578')
+        self.assertIn('$1000$', user.password)
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            res = self.client.post(TOKEN_URL, {
+                'email': 'test@example.com', 'password': 'testpass123'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertIn('$2000$', user.password)
+
+
+class AsyncLoginTests(TransactionTestCase):
+    """Test the async login view
+
+    Passwords are verified in another thread, on another connection, so
+    the test data must be committed.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        self.client = APIClient()
+
+    def test_async_login(self):
+        """Test the async view logs in like the token view"""
+        user = create_user(email='test@example.com', password='testpass123',
+                           phone_number='09145632578')
+
+        res = self.client.post(TOKEN_ASYNC_URL, {
+            'email': 'test@example.com', 'password': 'testpass123'},
+            format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['token'],
+                         Token.objects.get(user=user).key)
+        self.assertTrue(res.json()['first_time_login'])
+
+    def test_async_login_bad_credentials(self):
+        """Test the async view rejects a wrong password"""
+        create_user(email='test@example.com', password='testpass123',
+                    phone_number='09145632578')
+
+        res = self.client.post(TOKEN_ASYNC_URL, {
+            'email': 'test@example.com', 'password': 'wrong'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Token.objects.exists())
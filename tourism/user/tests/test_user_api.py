@@ -168,6 +168,30 @@ class PrivateUserApiTests(TestCase):
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_update_user_profile_single_write(self):
+        """Test a profile update writes only the changed columns once"""
+        payload = {'first_name': 'updated name', 'last_name': 'test',
+                   'card_info': '6037991234567890',
+                   'password': 'newpassword123'}
+
+        with self.assertNumQueries(1) as queries:
+            res = self.client.patch(ME_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sql = queries.captured_queries[0]['sql']
+        self.assertIn('"card_info"', sql)
+        self.assertNotIn('"last_name"', sql)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.card_info, payload['card_info'])
+        self.assertTrue(self.user.check_password(payload['password']))
+
+    def test_update_unchanged_profile_skips_write(self):
+        """Test a profile update without changes does not write"""
+        with self.assertNumQueries(0):
+            res = self.client.patch(ME_URL, {'first_name': 'test'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     # image test user api.
 
 
@@ -9,6 +9,7 @@ app_name = 'user'
 urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
+    path('token/async/', views.create_token_async, name='token-async'),
     path('me/', views.ManageUserView.as_view(), name='me'),
     path('comments/', views.UserCommentViews
          .as_view({'get': 'list', 'post': 'create'}), name='Comment'),
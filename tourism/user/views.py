@@ -1,19 +1,26 @@
 """Views for the user API."""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
 
-from rest_framework import generics, authentication, permissions
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken, Response
 from rest_framework.settings import api_settings
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import viewsets, status
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.authtoken.models import Token
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
     UserCommentSerializer
 )
 from core.models import Comment
+from core.pagination import CreatedAtCursorPagination
+from user.authentication import CachedTokenAuthentication, issue_token
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -22,6 +29,26 @@ class CreateUserView(generics.CreateAPIView):
     parser_classes = [MultiPartParser, FormParser]  # allow file uploads
 
 
+def log_in(user):
+    """Issue the token of an authenticated user, return the login data"""
+    token = issue_token(user)
+
+    response_data = {
+        'token': token.key,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'first_time_login': user.first_time_login,
+        'image': user.image.path,
+    }
+    if user.first_time_login:
+        user.first_time_login = False
+        user.save(update_fields=['first_time_login'])
+        response_data['first_time_login'] = True
+
+    return response_data
+
+
 class CreateTokenView(ObtainAuthToken):
     """Create a new auth token user."""
     serializer_class = AuthTokenSerializer
@@ -31,28 +58,61 @@ class CreateTokenView(ObtainAuthToken):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']  # type: ignore
-        token, created = Token.objects.get_or_create(user=user)
 
-        response_data = {
-            'token': token.key,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'first_time_login': user.first_time_login,
-            'image': user.image.path,
-        }
-        if user.first_time_login:
-            user.first_time_login = False
-            user.save(update_fields=['first_time_login'])
-            response_data['first_time_login'] = True
+        return Response(log_in(user), status=status.HTTP_200_OK)
+
+
+# bounds the password hashes computed at once, hashlib releases the GIL so
+# they run in parallel up to one per core
+login_executor = ThreadPoolExecutor(
+    max_workers=settings.LOGIN_HASH_WORKERS, thread_name_prefix='login')
+
+
+def verify_credentials(serializer):
+    """Validate the login serializer, closing the thread's connection"""
+    try:
+        return serializer.is_valid()
+    finally:
+        close_old_connections()
+
+
+async def create_token_async(request):
+    """Create a new auth token, verifying the password off the event loop.
+
+    Same contract as CreateTokenView. Under ASGI the worker keeps serving
+    other requests while the password hash is computed in
+    ``login_executor``.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    data = request.POST
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'detail': 'JSON parse error'},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = AuthTokenSerializer(data=data, context={'request': request})
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(
+            login_executor, verify_credentials, serializer):
+        return JsonResponse(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+
+    user = serializer.validated_data['user']  # type: ignore
+    return JsonResponse(await sync_to_async(log_in)(user))
+
 
-        return Response(response_data, status=status.HTTP_200_OK)
+# csrf_exempt does not wrap async views before Django 5.0
+create_token_async.csrf_exempt = True  # type: ignore
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
@@ -63,9 +123,10 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
 class UserCommentViews(viewsets.ModelViewSet):
     serializer_class = UserCommentSerializer
     queryset = Comment.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         """Filter queryset to aut"""